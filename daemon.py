@@ -0,0 +1,339 @@
+"""
+daemon.py — Long-running mode that keeps a connected, logged-in Chrome warm
+            and executes jobs submitted over a local HTTP API.
+
+A single worker thread owns the driver and runs jobs one at a time in
+submission order; the HTTP threads only queue jobs and read their state.
+Jobs use the same per-car steps and configuration as main.py, except that
+a delete job deletes the given listing outright and fails unless it is
+gone from the dashboard afterwards.
+
+Server:
+    python daemon.py serve [--port 8765]
+
+Client:
+    python daemon.py submit repost m2372621653 m2368587070 [--wait]
+    python daemon.py submit scrape m2372621653
+    python daemon.py submit delete m2372621653
+    python daemon.py job 3
+    python daemon.py status
+
+HTTP API (127.0.0.1 only):
+    POST /jobs        {"type": "repost" | "scrape" | "delete", "ids": [...]}  -> job
+                      (Content-Type: application/json, no Origin header)
+    GET  /jobs        all jobs
+    GET  /jobs/<id>   one job with per-listing progress and timings; scrape jobs
+                      include the scraped fields of each listing under "car"
+    GET  /status      browser state, current job, queue length
+"""
+
+import argparse
+import dataclasses
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import history
+import locators
+import main
+import poster
+import scraper
+
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+
+# While idle, reload the dashboard this often to keep the session and browser warm.
+KEEPALIVE_SECONDS = 600
+
+JOB_TYPES = ("repost", "scrape", "delete")
+
+
+class JobRunner:
+    """Owns the driver and executes queued jobs on a single worker thread."""
+
+    def __init__(self):
+        self.driver = None
+        self.started_at = time.time()
+        self.jobs = {}
+        self.current = None
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._cars_since_recycle = 0
+
+    # --- API side (HTTP threads) ---
+
+    def submit(self, job_type, ids):
+        job = {
+            'id': next(self._ids), 'type': job_type, 'ids': list(ids), 'state': 'queued',
+            'created': time.time(), 'started': None, 'finished': None, 'error': None,
+            'progress': [],
+        }
+        with self._lock:
+            self.jobs[job['id']] = job
+        self._queue.put(job['id'])
+        return self.snapshot(job['id'])
+
+    def snapshot(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def all_jobs(self):
+        with self._lock:
+            ids = sorted(self.jobs)
+        return [self.snapshot(j) for j in ids]
+
+    def status(self):
+        with self._lock:
+            return {
+                'browser': 'connected' if self.driver else 'starting',
+                'uptime_seconds': round(time.time() - self.started_at),
+                'current_job': self.current,
+                'queued': self._queue.qsize(),
+                'jobs': len(self.jobs),
+            }
+
+    # --- Worker thread ---
+
+    def run(self):
+        main.kill_chrome()
+        main.launch_chrome()
+        self.driver = main.connect_driver()
+        print(f"Browser ready. Listening on http://{DAEMON_HOST}:{DAEMON_PORT}")
+        while True:
+            try:
+                job_id = self._queue.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                self._keepalive()
+                continue
+            self._run_job(job_id)
+
+    def _keepalive(self):
+        try:
+            self.driver.get(main.DASHBOARD_URL)
+        except Exception as e:
+            print(f"Browser not responding ({e}), restarting it.")
+            self.driver = main.recycle_browser(self.driver)
+
+    def _ensure_driver(self):
+        try:
+            self.driver.current_url
+        except Exception as e:
+            print(f"Browser not responding ({e}), restarting it.")
+            self.driver = main.recycle_browser(self.driver)
+
+    def _run_job(self, job_id):
+        job = self.jobs[job_id]
+        with self._lock:
+            job['state'] = 'running'
+            job['started'] = time.time()
+            self.current = job_id
+        print(f"\n=== Job {job_id}: {job['type']} {', '.join(job['ids'])} ===")
+        history.start_run([f"daemon:{job['type']}"])
+        added = errors = 0
+        try:
+            self._ensure_driver()
+            titles = self._dashboard_titles() if job['type'] == 'delete' else {}
+            for i, listing_id in enumerate(job['ids']):
+                entry = {'listing_id': listing_id, 'title': titles.get(listing_id, ""),
+                         'status': 'running', 'error': None, 'seconds': None, 'car': None}
+                with self._lock:
+                    job['progress'].append(entry)
+                started = time.time()
+                history.start_listing(listing_id, entry['title'])
+                try:
+                    car = self._run_listing(job['type'], listing_id)
+                    if car:
+                        entry['title'] = car.var_title
+                        if job['type'] == 'scrape':
+                            entry['car'] = dataclasses.asdict(car)
+                    entry['status'] = 'done'
+                    if job['type'] == 'repost':
+                        added += 1
+                    history.end_listing('ok')
+                except Exception as e:
+                    print(f"  ERROR: {e}")
+                    entry['status'], entry['error'] = 'failed', str(e)
+                    errors += 1
+                    history.end_listing('failed', str(e))
+                entry['seconds'] = round(time.time() - started, 1)
+
+                self._cars_since_recycle += 1
+                is_last = i == len(job['ids']) - 1
+                self.driver, _, recycled = main.between_cars(self.driver, self._cars_since_recycle, is_last)
+                if recycled:
+                    self._cars_since_recycle = 0
+            job['state'] = 'done' if not errors else 'failed'
+        except Exception as e:
+            print(f"  Job {job_id} aborted: {e}")
+            job['state'], job['error'] = 'failed', str(e)
+        finally:
+            history.end_run(len(job['ids']), added, errors)
+            locators.save()
+            with self._lock:
+                job['finished'] = time.time()
+                self.current = None
+            print(f"=== Job {job_id} {job['state']} in {job['finished'] - job['started']:.0f}s ===")
+
+    def _run_listing(self, job_type, listing_id):
+        """Run one listing of a job. Returns the scraped CarData, or None for a delete."""
+        if job_type == 'delete':
+            # An explicit delete: no DELETE_AFTER_POST or same-title safety check
+            history.mark_step("delete")
+            poster.delete_listing(self.driver, listing_id)
+            return None
+        car = main.scrape_car(self.driver, f"https://www.2dehands.be/seller/view/{listing_id}")
+        if job_type == 'repost':
+            main.post_car(self.driver, car)
+            main.delete_original(self.driver, car)
+        return car
+
+    def _dashboard_titles(self):
+        items, _ = scraper.collect_listings(self.driver)
+        return {main.listing_id_from_url(url): title for title, url in items}
+
+
+# ---------------------------------------------------------------------------
+# HTTP API
+# ---------------------------------------------------------------------------
+
+def make_handler(runner):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, payload):
+            body = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if parts == ["status"]:
+                return self._send(200, runner.status())
+            if parts == ["jobs"]:
+                return self._send(200, runner.all_jobs())
+            if len(parts) == 2 and parts[0] == "jobs" and parts[1].isdigit():
+                job = runner.snapshot(int(parts[1]))
+                return self._send(200, job) if job else self._send(404, {'error': "no such job"})
+            self._send(404, {'error': "unknown endpoint"})
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send(404, {'error': "unknown endpoint"})
+            # Web pages can POST to localhost too. A JSON content type forces a CORS
+            # preflight this server never approves; browsers also always send Origin.
+            if self.headers.get("Origin"):
+                return self._send(403, {'error': "requests from web pages are not accepted"})
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type != "application/json":
+                return self._send(415, {'error': "Content-Type must be application/json"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                job_type, ids = request["type"], request["ids"]
+            except (ValueError, KeyError, TypeError):
+                return self._send(400, {'error': 'expected {"type": ..., "ids": [...]}'})
+            if job_type not in JOB_TYPES or not ids or not all(isinstance(i, str) for i in ids):
+                return self._send(400, {'error': f"type must be one of {JOB_TYPES} with a list of listing IDs"})
+            self._send(202, runner.submit(job_type, ids))
+
+        def log_message(self, fmt, *args):
+            pass  # keep the console for job output
+
+    return Handler
+
+
+def serve(port=DAEMON_PORT):
+    global DAEMON_PORT
+    DAEMON_PORT = port
+    runner = JobRunner()
+    server = ThreadingHTTPServer((DAEMON_HOST, port), make_handler(runner))
+    threading.Thread(target=server.serve_forever, name="http", daemon=True).start()
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        print("Stopping daemon.")
+    finally:
+        server.shutdown()
+        try:
+            runner.driver.quit()
+        except Exception:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def _request(port, path, payload=None):
+    url = f"http://{DAEMON_HOST}:{port}{path}"
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read())
+
+
+def _print_job(job):
+    took = f" in {job['finished'] - job['started']:.0f}s" if job.get('finished') and job.get('started') else ""
+    print(f"Job {job['id']} ({job['type']}): {job['state']}{took}")
+    for p in job['progress']:
+        seconds = f" {p['seconds']}s" if p['seconds'] is not None else ""
+        print(f"  {p['listing_id']}  {p['status']}{seconds}  {p['title']}")
+        if p['error']:
+            print(f"      {p['error']}")
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="jbcars_auto daemon and client.")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="start the daemon")
+    p = sub.add_parser("submit", help="queue a job")
+    p.add_argument("type", choices=JOB_TYPES)
+    p.add_argument("ids", nargs="+", help="listing IDs, e.g. m2372621653")
+    p.add_argument("--wait", action="store_true", help="wait until the job has finished")
+    p = sub.add_parser("job", help="show a job")
+    p.add_argument("job_id", type=int)
+    sub.add_parser("status", help="show daemon status")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.port)
+        return
+
+    try:
+        if args.command == "submit":
+            job = _request(args.port, "/jobs", {'type': args.type, 'ids': args.ids})
+            if 'id' not in job:
+                sys.exit(job['error'])
+            print(f"Queued job {job['id']}.")
+            while args.wait and job['state'] in ('queued', 'running'):
+                time.sleep(2)
+                job = _request(args.port, f"/jobs/{job['id']}")
+            if args.wait:
+                _print_job(job)
+        elif args.command == "job":
+            job = _request(args.port, f"/jobs/{args.job_id}")
+            if 'id' not in job:
+                sys.exit(job['error'])
+            _print_job(job)
+        elif args.command == "status":
+            print(json.dumps(_request(args.port, "/status"), indent=2))
+    except urllib.error.URLError as e:
+        sys.exit(f"Daemon not reachable on port {args.port}: {e.reason}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,140 @@
+"""
+direct_upload.py — Standalone tool that posts photos straight to an upload
+                   endpoint with parallel requests, to measure how fast an
+                   endpoint takes images outside the browser.
+
+Uses a pooled requests.Session and UPLOAD_CONCURRENCY parallel multipart
+requests (optionally with cookies and headers copied from a browser session).
+
+It is not wired into posting: the place-ad form keeps its uploaded images in
+the uploader's client-side state, which uploaded references cannot be handed
+to from outside (hidden form inputs are ignored). Listings always upload
+through the form's file input (uploads.py).
+
+Testing against a local stand-in endpoint:
+    python direct_upload.py stand-in --port 8099
+    python direct_upload.py upload http://127.0.0.1:8099/upload photos/old/Some_Car/*.jpg
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+UPLOAD_FIELD = "file"             # multipart field name for the image
+RESPONSE_REF_KEY = "id"           # key of the image reference in the JSON response
+UPLOAD_CONCURRENCY = 6
+UPLOAD_TIMEOUT = 60
+UPLOAD_RETRIES = 2
+
+
+def upload_files(files, url, cookies=None, headers=None, concurrency=UPLOAD_CONCURRENCY):
+    """
+    Upload files in parallel to url. Does not need a browser.
+
+    Returns a list of per-file dicts in file order:
+    {'file', 'status' ('ok' / 'failed'), 'seconds', 'attempts', 'ref', 'error'}
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers or {})
+    for name, value in (cookies or {}).items():
+        session.cookies.set(name, value)
+
+    def upload(path):
+        entry = {'file': path, 'status': 'failed', 'seconds': 0.0, 'attempts': 0, 'ref': None, 'error': None}
+        start = time.monotonic()
+        for attempt in range(1 + UPLOAD_RETRIES):
+            entry['attempts'] = attempt + 1
+            try:
+                with open(path, "rb") as f:
+                    resp = session.post(url, files={UPLOAD_FIELD: (os.path.basename(path), f, "image/jpeg")},
+                                        timeout=UPLOAD_TIMEOUT)
+                resp.raise_for_status()
+                entry['ref'] = str(resp.json()[RESPONSE_REF_KEY])
+                entry['status'] = 'ok'
+                entry['error'] = None
+                break
+            except (requests.RequestException, OSError, ValueError, KeyError) as e:
+                entry['error'] = f"{e.__class__.__name__}: {e}"
+                if attempt < UPLOAD_RETRIES:
+                    time.sleep(1 + attempt)
+        entry['seconds'] = time.monotonic() - start
+        return entry
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(upload, files))
+    finally:
+        session.close()
+
+
+# ---------------------------------------------------------------------------
+# Local stand-in endpoint
+# ---------------------------------------------------------------------------
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Accepts multipart image uploads and answers {RESPONSE_REF_KEY: <uuid>}."""
+
+    delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        time.sleep(self.delay)
+        if b"filename=" not in body:
+            self.send_response(400)
+            self.end_headers()
+            return
+        payload = json.dumps({RESPONSE_REF_KEY: uuid.uuid4().hex, 'bytes': length}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve_stand_in(port, delay=0.0):
+    _StandInHandler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StandInHandler)
+    print(f"Stand-in upload endpoint on http://127.0.0.1:{port}/upload (delay {delay}s per image)")
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Direct photo upload tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("stand-in", help="run a local stand-in upload endpoint")
+    p.add_argument("--port", type=int, default=8099)
+    p.add_argument("--delay", type=float, default=0.5, help="simulated seconds per image")
+    p = sub.add_parser("upload", help="upload files to an endpoint (no browser)")
+    p.add_argument("url")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--concurrency", type=int, default=UPLOAD_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    if args.command == "stand-in":
+        serve_stand_in(args.port, args.delay)
+        return
+    start = time.monotonic()
+    report = upload_files(args.files, args.url, concurrency=args.concurrency)
+    for entry in report:
+        print(f"{os.path.basename(entry['file'])}: {entry['status']} ({entry['seconds']:.1f}s) "
+              f"{entry['ref'] or entry['error']}")
+    print(f"{sum(e['status'] == 'ok' for e in report)}/{len(report)} uploaded in {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+history.py — Structured run history in a local SQLite database, plus a small
+             CLI to query trends.
+
+Every run, every listing processed in it and every step of that listing is
+stored with its timings. Recording is driven by module-level calls so the
+scraper/poster code only needs history.mark_step(name); all calls are no-ops
+when no run has been started (e.g. when poster is used on its own).
+
+Usage:
+    python history.py runs [--last 10]
+    python history.py throughput [--runs 30]
+    python history.py slowest-steps [--days 7] [--limit 10]
+    python history.py failing [--streak 3]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import time
+
+
+HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    filter      TEXT,
+    total       INTEGER,
+    added       INTEGER,
+    errors      INTEGER
+);
+CREATE TABLE IF NOT EXISTS listings (
+    id          INTEGER PRIMARY KEY,
+    run_id      INTEGER NOT NULL REFERENCES runs(id),
+    listing_id  TEXT NOT NULL,
+    title       TEXT,
+    status      TEXT,           -- 'ok', 'failed', 'skipped'
+    error       TEXT,
+    started_at  REAL NOT NULL,
+    seconds     REAL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id          INTEGER PRIMARY KEY,
+    listing_row INTEGER NOT NULL REFERENCES listings(id),
+    step        TEXT NOT NULL,
+    status      TEXT,           -- 'ok', 'failed'
+    error       TEXT,
+    started_at  REAL NOT NULL,
+    seconds     REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started      ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_listings_run      ON listings(run_id);
+CREATE INDEX IF NOT EXISTS idx_listings_listing  ON listings(listing_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_steps_started     ON steps(started_at, step);
+CREATE INDEX IF NOT EXISTS idx_steps_listing     ON steps(listing_row);
+"""
+
+
+def connect(db_path=HISTORY_DB):
+    conn = sqlite3.connect(db_path, timeout=10)
+    # Not WAL: workers may share this file on a network drive (see workqueue.py)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+_conn = None
+_run_id = None
+_listing = None   # {'row', 'started_at', 'step', 'step_started_at'} for the car in progress
+_current_step = None
+
+
+def start_run(filter_titles=None, db_path=HISTORY_DB):
+    """Open the history database and record the start of a run."""
+    global _conn, _run_id
+    try:
+        _conn = connect(db_path)
+        cur = _conn.execute(
+            "INSERT INTO runs (started_at, filter) VALUES (?, ?)",
+            (time.time(), ", ".join(filter_titles) if filter_titles else None),
+        )
+        _conn.commit()
+        _run_id = cur.lastrowid
+    except sqlite3.Error as e:
+        print(f"Warning: run history disabled ({e})")
+        _conn = _run_id = None
+    return _run_id
+
+
+def start_listing(listing_id, title):
+    """Record the start of processing one listing."""
+    global _listing
+    if _run_id is None:
+        return
+    now = time.time()
+    cur = _write(
+        "INSERT INTO listings (run_id, listing_id, title, started_at) VALUES (?, ?, ?, ?)",
+        (_run_id, listing_id, title, now),
+    )
+    _listing = {'row': cur.lastrowid, 'started_at': now, 'step': None, 'step_started_at': now} if cur else None
+
+
+def mark_step(name):
+    """Close the current step (as succeeded) and start timing the next one."""
+    global _current_step
+    _current_step = name
+    if _listing is None:
+        return
+    _close_step('ok')
+    _listing['step'] = name
+    _listing['step_started_at'] = time.time()
+
+
+def end_listing(status, error=None):
+    """Record the outcome of the listing in progress. A failure is charged to the open step."""
+    global _listing, _current_step
+    _current_step = None
+    if _listing is None:
+        return
+    _close_step('failed' if status == 'failed' else 'ok', error)
+    _write(
+        "UPDATE listings SET status = ?, error = ?, seconds = ? WHERE id = ?",
+        (status, error, time.time() - _listing['started_at'], _listing['row']),
+    )
+    _listing = None
+
+
+def current_step():
+    """Return the name of the step in progress, or None."""
+    return _current_step
+
+
+def record_skipped(listing_id, title, reason):
+    """Record a listing that was not processed in this run (e.g. duplicate title)."""
+    if _run_id is None:
+        return
+    _write(
+        "INSERT INTO listings (run_id, listing_id, title, status, error, started_at, seconds) "
+        "VALUES (?, ?, ?, 'skipped', ?, ?, 0)",
+        (_run_id, listing_id, title, reason, time.time()),
+    )
+
+
+def end_run(total, added, errors):
+    """Record the end of the run and close the database."""
+    global _conn, _run_id
+    if _run_id is None:
+        return
+    if _listing is not None:
+        end_listing('failed', "Run ended while listing was in progress.")
+    _write(
+        "UPDATE runs SET finished_at = ?, total = ?, added = ?, errors = ? WHERE id = ?",
+        (time.time(), total, added, errors, _run_id),
+    )
+    _conn.close()
+    _conn = _run_id = None
+
+
+def _close_step(status, error=None):
+    if _listing['step'] is None:
+        return
+    _write(
+        "INSERT INTO steps (listing_row, step, status, error, started_at, seconds) VALUES (?, ?, ?, ?, ?, ?)",
+        (_listing['row'], _listing['step'], status, error,
+         _listing['step_started_at'], time.time() - _listing['step_started_at']),
+    )
+    _listing['step'] = None
+
+
+def _write(sql, params):
+    """
+    Execute and commit one write right away, so the write lock is never held
+    across a car (other workers and the daemon share the file). Returns the
+    cursor, or None if the write failed — history must never fail a run.
+    """
+    try:
+        cur = _conn.execute(sql, params)
+        _conn.commit()
+        return cur
+    except sqlite3.Error as e:
+        print(f"  Warning: could not record history ({e})")
+        try:
+            _conn.rollback()
+        except sqlite3.Error:
+            pass
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def recent_runs(conn, last=10):
+    return conn.execute(
+        "SELECT id, started_at, finished_at, total, added, errors FROM runs "
+        "ORDER BY started_at DESC LIMIT ?", (last,)
+    ).fetchall()
+
+
+def throughput(conn, runs=30):
+    """Return [(run_id, started_at, cars_added, hours, cars_per_hour)] for the last finished runs."""
+    rows = conn.execute(
+        "SELECT id, started_at, added, (finished_at - started_at) / 3600.0 FROM runs "
+        # Daemon scrape/delete jobs post nothing and would only dilute the rate
+        "WHERE finished_at IS NOT NULL AND COALESCE(filter, '') NOT IN ('daemon:scrape', 'daemon:delete') "
+        "ORDER BY started_at DESC LIMIT ?", (runs,)
+    ).fetchall()
+    return [(rid, started, added or 0, hours, (added or 0) / hours if hours else 0.0)
+            for rid, started, added, hours in rows]
+
+
+def slowest_steps(conn, days=7, limit=10):
+    """Return [(step, count, avg_seconds, max_seconds, failures)] since `days` ago, slowest first."""
+    since = time.time() - days * 86400
+    return conn.execute(
+        "SELECT step, COUNT(*), AVG(seconds), MAX(seconds), SUM(status = 'failed') FROM steps "
+        "WHERE started_at >= ? GROUP BY step ORDER BY AVG(seconds) DESC LIMIT ?", (since, limit)
+    ).fetchall()
+
+
+def failing_listings(conn, streak=3):
+    """Return [(listing_id, title, last_error)] whose last `streak` attempts all failed."""
+    return conn.execute(
+        """
+        WITH ranked AS (
+            SELECT listing_id, title, status, error,
+                   ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY run_id DESC) AS rn
+            FROM listings
+            WHERE status IN ('ok', 'failed')
+        )
+        SELECT listing_id, MAX(CASE WHEN rn = 1 THEN title END),
+                           MAX(CASE WHEN rn = 1 THEN error END)
+        FROM ranked
+        WHERE rn <= ?
+        GROUP BY listing_id
+        HAVING COUNT(*) = ? AND SUM(status = 'failed') = ?
+        """, (streak, streak, streak)
+    ).fetchall()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _fmt_time(ts):
+    return datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M') if ts else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query jbcars_auto run history.")
+    parser.add_argument("--db", default=HISTORY_DB, help="history database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("runs", help="most recent runs")
+    p.add_argument("--last", type=int, default=10)
+    p = sub.add_parser("throughput", help="cars/hour over the last runs")
+    p.add_argument("--runs", type=int, default=30)
+    p = sub.add_parser("slowest-steps", help="slowest steps over the last days")
+    p.add_argument("--days", type=int, default=7)
+    p.add_argument("--limit", type=int, default=10)
+    p = sub.add_parser("failing", help="listings that failed several runs in a row")
+    p.add_argument("--streak", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+
+    if args.command == "runs":
+        for rid, started, finished, total, added, errors in recent_runs(conn, args.last):
+            print(f"#{rid:<5} {_fmt_time(started)} - {_fmt_time(finished)}  "
+                  f"listings {total or 0:>3}  added {added or 0:>3}  errors {errors or 0:>3}")
+
+    elif args.command == "throughput":
+        rows = throughput(conn, args.runs)
+        for rid, started, added, hours, rate in rows:
+            print(f"#{rid:<5} {_fmt_time(started)}  {added:>3} car(s) in {hours * 60:6.1f} min  "
+                  f"{rate:6.1f} cars/hour")
+        total_added = sum(r[2] for r in rows)
+        total_hours = sum(r[3] for r in rows)
+        if total_hours:
+            print(f"Overall: {total_added / total_hours:.1f} cars/hour over {len(rows)} run(s)")
+
+    elif args.command == "slowest-steps":
+        for step, count, avg, worst, failures in slowest_steps(conn, args.days, args.limit):
+            print(f"{step:<22} avg {avg:6.1f}s  max {worst:6.1f}s  n={count:<5} failed={failures}")
+
+    elif args.command == "failing":
+        rows = failing_listings(conn, args.streak)
+        for listing_id, title, error in rows:
+            print(f"{listing_id}  {title}")
+            print(f"    {error}")
+        if not rows:
+            print(f"No listings failed {args.streak} run(s) in a row.")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
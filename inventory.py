@@ -0,0 +1,111 @@
+"""
+inventory.py — Bulk export/import of scraped CarData records as CSV, for
+               repricing or re-describing many cars at once.
+
+Export scrapes every active listing (photos are downloaded as usual) and
+writes one row per car as soon as it is scraped. Edit the file in a
+spreadsheet, then feed it straight into the posting pipeline without
+scraping again:
+
+    python inventory.py export inventory.csv
+    python main.py --import inventory.csv
+
+Both directions stream row by row, so memory use does not grow with the
+number of records. Columns are the CarData field names; var_picspath points
+at the downloaded photo folder and edit_url at the original listing, which
+is deleted after the new one is posted (if DELETE_AFTER_POST). The delete
+only goes ahead when two listings with the same title are on the dashboard,
+so if you change a title the original has to be deleted by hand.
+
+Listings whose title appears more than once are not exported, as in a
+normal run. Photos are moved to photos/old after each post, so an export can
+be imported once. Cars whose photo folder is gone, or whose original listing
+is no longer on the dashboard, are reported as errors instead of being posted.
+"""
+
+import argparse
+import csv
+import dataclasses
+
+from models import CarData
+
+
+FIELDS = [f.name for f in dataclasses.fields(CarData)]
+
+
+def write_records(path, cars):
+    """Write CarData records to a CSV file as they arrive. Returns the number written."""
+    count = 0
+    # utf-8-sig so Excel opens accented titles correctly
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for car in cars:
+            writer.writerow(dataclasses.asdict(car))
+            f.flush()
+            count += 1
+    return count
+
+
+def read_records(path):
+    """Yield CarData records from a CSV file one at a time. Unknown columns are ignored."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = {"var_title", "edit_url"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{path} is missing column(s): {', '.join(sorted(missing))}")
+        for row in reader:
+            values = {k: (v or "") for k, v in row.items() if k in FIELDS}
+            if not values.get("var_title"):
+                continue
+            yield CarData(**values)
+
+
+def scrape_all(driver, filter_titles=None, exclude_titles=None):
+    """
+    Yield a scraped CarData for every active listing on the dashboard.
+    Listings sharing a title are skipped like in main.py: their photos would
+    be downloaded into the same photos/<title> folder.
+    """
+    import main
+    import scraper
+
+    items, _ = scraper.collect_listings(driver, filter_titles=filter_titles, exclude_titles=exclude_titles)
+    items, duplicates = main.drop_duplicate_titles(items)
+    for title in dict.fromkeys(title for title, _ in duplicates):
+        print(f"  SKIP (duplicate title, not exported): {title}")
+    for i, (title, edit_url) in enumerate(items, start=1):
+        print(f"[{i}/{len(items)}] {title}")
+        car = scraper.scrape_one_listing(driver, edit_url)
+        if car:
+            yield car
+        else:
+            print(f"  Warning: could not scrape '{title}', not exported.")
+
+
+def export(path):
+    """Start Chrome, scrape all listings matching main.py's filters and write them to path."""
+    import main
+
+    main.kill_chrome()
+    main.launch_chrome()
+    driver = main.connect_driver()
+    try:
+        count = write_records(path, scrape_all(
+            driver,
+            filter_titles=main.FILTER_TITLES or None,
+            exclude_titles=main.EXCLUDE_TITLES or None,
+        ))
+    finally:
+        driver.quit()
+    print(f"Exported {count} car(s) to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export scraped listings to CSV.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("export", help="scrape all listings into a CSV file")
+    p.add_argument("path")
+    args = parser.parse_args()
+    if args.command == "export":
+        export(args.path)
@@ -0,0 +1,473 @@
+"""
+loadgen.py — Synthetic large-inventory load generator and scaling benchmark
+             for the parts of the pipeline that do not need a browser.
+
+Generates fake seller dashboards (served to _collect_listing_items through a
+stand-in driver that answers its XPath lookups) and CarData sets with a
+configurable size, duplicate-title rate, reserved rate and photo count, then
+times each stage at increasing inventory sizes:
+
+    collect     scraper._collect_listing_items on the fake dashboard
+    filter      scraper.filter_listings with FILTER_TITLES / EXCLUDE_TITLES
+    duplicates  main.drop_duplicate_titles
+    report      main.build_report_lines
+    inventory   inventory.write_records + read_records round trip
+    workqueue   workqueue.enqueue + claim/complete of every item
+    photos      poster.photo_files over the photo folders (--photos only)
+
+Each stage is run --repeats times per size on fresh inputs, for time and
+again under tracemalloc for peak memory; the medians are printed as a table
+and an ASCII chart per stage. The growth exponent is the slope of log(median)
+against log(size) over all sizes. A stage is flagged as worse than linear
+only when the exponent fitted to every single repeat is above
+SUPERLINEAR_SLOPE, so one noisy sample cannot raise a false alarm.
+
+    python loadgen.py
+    python loadgen.py --sizes 100 500 1000 5000 --duplicate-rate 0.1 --csv scaling.csv
+    python loadgen.py --stages workqueue --sizes 100 200 400 800 --plot scaling.png
+"""
+
+import argparse
+import contextlib
+import csv
+import gc
+import math
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from selenium.common.exceptions import NoSuchElementException
+
+import inventory
+import main
+import poster
+import scraper
+import workqueue
+from models import CarData
+
+
+DEFAULT_SIZES = [10, 50, 100, 250, 500, 1000, 2500, 5000]
+DEFAULT_REPEATS = 5
+
+# Slope of log(time) vs log(size) above which a stage is flagged. 1.0 is
+# linear; the margin absorbs the remaining timer and allocator noise.
+SUPERLINEAR_SLOPE = 1.2
+
+BRANDS = {
+    "Citroën": ["C3", "C4 Picasso", "Berlingo", "C5 Aircross"],
+    "Peugeot": ["208", "308", "2008", "5008"],
+    "Volkswagen": ["Polo", "Golf", "Tiguan", "Touran"],
+    "Renault": ["Clio", "Captur", "Mégane", "Kangoo"],
+    "Toyota": ["Yaris", "Aygo", "Corolla", "RAV4"],
+    "BMW": ["116i", "318d", "X1", "520d"],
+}
+FUELS = ["Benzine", "Diesel", "Hybride", "Elektrisch"]
+TRANSMISSIONS = ["Manueel", "Automaat"]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def make_titles(size, duplicate_rate=0.05, rng=None):
+    """
+    Return size listing titles. About duplicate_rate of them repeat an earlier
+    title exactly, the way a car listed twice shows up on the dashboard.
+    """
+    rng = rng or random.Random(0)
+    titles = []
+    for i in range(size):
+        if titles and rng.random() < duplicate_rate:
+            titles.append(rng.choice(titles))
+            continue
+        brand = rng.choice(list(BRANDS))
+        model = rng.choice(BRANDS[brand])
+        year = rng.randint(2008, 2024)
+        km = rng.randrange(5_000, 250_000, 500)
+        titles.append(f"{brand} {model} {rng.choice(FUELS)} {year} {km:,} km #{i}".replace(",", "."))
+    return titles
+
+
+def _slug(title):
+    return scraper._norm(title).replace(" ", "-")
+
+
+def make_dashboard(size, duplicate_rate=0.05, reserved_rate=0.05, seed=0):
+    """
+    Return a list of listing card dicts {'href', 'title', 'reserved'} as the
+    dashboard would show them, including the extra anchors the real page has
+    (a second link per card and seller links) so the de-duplication is exercised.
+    """
+    rng = random.Random(seed)
+    cards = []
+    for i, title in enumerate(make_titles(size, duplicate_rate, rng)):
+        brand = title.split()[0].lower()
+        href = f"https://www.2dehands.be/v/auto-s/{brand}/m{2300000000 + i}-{_slug(title)}"
+        cards.append({'href': href, 'title': title, 'reserved': rng.random() < reserved_rate})
+    return cards
+
+
+def make_cars(size, duplicate_rate=0.05, photos=0, photo_dir=None, seed=0):
+    """
+    Return size CarData records. With photos > 0 and a photo_dir, each car gets
+    a folder with that many small placeholder JPEG files.
+    """
+    rng = random.Random(seed)
+    cars = []
+    for i, title in enumerate(make_titles(size, duplicate_rate, rng)):
+        brand, model = title.split()[0], title.split()[1]
+        car = CarData(
+            var_title=title,
+            var_brand=brand,
+            var_model=model,
+            var_desc=f"{title}\n\nGoed onderhouden, onderhoudsboekje aanwezig.\n" * 3,
+            var_price=str(rng.randrange(2_000, 45_000, 250)),
+            var_year=title.split()[-4],
+            var_gas=rng.choice(FUELS),
+            var_transmissie=rng.choice(TRANSMISSIONS),
+            var_km=str(rng.randrange(5_000, 250_000, 500)),
+            var_options="airco,cruise_control,navigation,parking_sensors",
+            edit_url=f"https://www.2dehands.be/seller/view/m{2300000000 + i}",
+        )
+        if photos and photo_dir:
+            car.var_picspath = os.path.join(photo_dir, f"car_{i:06d}")
+            os.makedirs(car.var_picspath, exist_ok=True)
+            for n in range(photos):
+                with open(os.path.join(car.var_picspath, f"{n:02d}.jpg"), "wb") as f:
+                    f.write(b"\xff\xd8\xff\xe0" + bytes(64) + b"\xff\xd9")
+        cars.append(car)
+    return cars
+
+
+# ---------------------------------------------------------------------------
+# Stand-in driver for _collect_listing_items
+# ---------------------------------------------------------------------------
+
+class _FakeElement:
+    """Answers the element-level lookups _collect_listing_items and _is_reserved make."""
+
+    def __init__(self, text="", href=None, title=None, reserved=False):
+        self.text = text
+        self._href = href
+        self._title = title
+        self._reserved = reserved
+
+    def get_attribute(self, name):
+        return self._href if name == "href" else None
+
+    def find_element(self, by, value):
+        if value == ".//span":
+            if self._title is None:
+                raise NoSuchElementException(value)
+            return _FakeElement(text=self._title)
+        if value.startswith("./ancestor::"):
+            return _FakeElement(reserved=self._reserved)
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        if "gereserveerd" in value:
+            return [_FakeElement(text="Gereserveerd")] if self._reserved else []
+        return []
+
+
+class FakeDashboardDriver:
+    """Serves a synthetic dashboard to the scraper's XPath lookups without a browser."""
+
+    def __init__(self, cards):
+        self._links = []
+        for card in cards:
+            link = _FakeElement(href=card['href'], title=card['title'], reserved=card['reserved'])
+            # The card image and the title are separate anchors to the same listing
+            self._links.append(link)
+            self._links.append(_FakeElement(href=card['href'] + "?utm=image", title=card['title'],
+                                            reserved=card['reserved']))
+        self._links.append(_FakeElement(href="https://www.2dehands.be/v/auto-s/seller/overview"))
+
+    def find_element(self, by, value):
+        if self._links:
+            return self._links[0]
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        return list(self._links) if value == "//a[contains(@href, '/v/auto-s/')]" else []
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+def _stage_collect(ctx):
+    ctx['items'] = scraper._collect_listing_items(ctx['driver'])
+
+
+def _stage_filter(ctx):
+    ctx['filtered'], ctx['stats'] = scraper.filter_listings(
+        ctx['items'], ctx['filter_titles'], ctx['exclude_titles'])
+
+
+def _stage_duplicates(ctx):
+    ctx['unique'], ctx['duplicates'] = main.drop_duplicate_titles(ctx['filtered'])
+
+
+def _stage_report(ctx):
+    duplicates = list(dict.fromkeys(title for title, _ in ctx['duplicates']))
+    errors = [(title, "Timeout waiting for submit") for title, _ in ctx['unique'][::50]]
+    total = len(ctx['unique'])
+    ctx['report'] = main.build_report_lines(ctx['stats'], total - len(errors), total, duplicates, errors,
+                                            requests_total=total * 120, blocked_total=total * 40,
+                                            recycles=total // main.RECYCLE_EVERY_CARS)
+
+
+def _stage_inventory(ctx):
+    path = os.path.join(ctx['tmp'], "inventory.csv")
+    inventory.write_records(path, ctx['cars'])
+    ctx['read_back'] = sum(1 for _ in inventory.read_records(path))
+
+
+def _stage_workqueue(ctx):
+    conn = workqueue.connect(os.path.join(ctx['tmp'], f"workqueue_{time.perf_counter_ns()}.db"))
+    try:
+        workqueue.enqueue(conn, "loadgen", ctx['unique'])
+        worker = workqueue.worker_name(0)
+        while True:
+            item = workqueue.claim(conn, "loadgen", worker)
+            if item is None:
+                break
+            workqueue.complete(conn, "loadgen", item['title'], worker, 'done')
+    finally:
+        conn.close()
+
+
+def _stage_photos(ctx):
+    ctx['photo_count'] = sum(len(poster.photo_files(car.var_picspath, main.MAX_PHOTOS)) for car in ctx['cars'])
+
+
+STAGES = [
+    ('collect', _stage_collect),
+    ('filter', _stage_filter),
+    ('duplicates', _stage_duplicates),
+    ('report', _stage_report),
+    ('inventory', _stage_inventory),
+    ('workqueue', _stage_workqueue),
+    ('photos', _stage_photos),
+]
+
+
+def _measure(fn, ctx, repeats):
+    """
+    Run fn repeats times for timing and repeats times under tracemalloc, each
+    time on a fresh copy of the inputs in ctx, so earlier runs' outputs are
+    never part of a measurement. Afterwards fn runs once more on ctx itself to
+    provide its outputs to the next stages.
+    Returns (seconds samples, peak traced bytes samples).
+    """
+    times, peaks = [], []
+    for _ in range(repeats):
+        fresh = dict(ctx)
+        start = time.perf_counter()
+        fn(fresh)
+        times.append(time.perf_counter() - start)
+        del fresh
+    # Measured separately: tracing slows everything down and would distort the timings
+    for _ in range(repeats):
+        fresh = dict(ctx)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn(fresh)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peaks.append(peak)
+        del fresh
+    fn(ctx)
+    return times, peaks
+
+
+def run(sizes=DEFAULT_SIZES, stages=None, duplicate_rate=0.05, reserved_rate=0.05, photos=0,
+        filter_titles=None, exclude_titles=None, repeats=DEFAULT_REPEATS):
+    """
+    Run every stage at every size. Returns a list of {'stage', 'size',
+    'seconds', 'peak_bytes', 'seconds_samples', 'peak_samples'} dicts, where
+    seconds and peak_bytes are the medians of the samples.
+    """
+    stages = stages or [name for name, _ in STAGES if name != 'photos' or photos]
+    results = []
+    for size in sizes:
+        tmp = tempfile.mkdtemp(prefix="loadgen_")
+        try:
+            ctx = {
+                'tmp': tmp,
+                'driver': FakeDashboardDriver(make_dashboard(size, duplicate_rate, reserved_rate)),
+                'cars': make_cars(size, duplicate_rate, photos, os.path.join(tmp, "photos")),
+                'filter_titles': filter_titles,
+                'exclude_titles': exclude_titles,
+            }
+            print(f"Size {size}: ", end="", flush=True)
+            # Stages feed each other, so the earlier ones always run; only selected ones are recorded
+            for name, fn in STAGES:
+                if name == 'photos' and not photos:
+                    continue
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    if name in stages:
+                        times, peaks = _measure(fn, ctx, repeats)
+                    else:
+                        fn(ctx)
+                if name in stages:
+                    seconds = statistics.median(times)
+                    results.append({'stage': name, 'size': size, 'seconds': seconds,
+                                    'peak_bytes': statistics.median(peaks),
+                                    'seconds_samples': times, 'peak_samples': peaks})
+                    print(f"{name} {seconds * 1000:.1f}ms  ", end="", flush=True)
+            print()
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Analysis and output
+# ---------------------------------------------------------------------------
+
+def growth_exponent(points):
+    """Least-squares slope of log(y) against log(x) over (x, y) points with y > 0."""
+    logs = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len(logs) < 2:
+        return None
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    var_x = sum((x - mean_x) ** 2 for x, _ in logs)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in logs) / var_x
+
+
+def _consistently_above(rows, key, threshold):
+    """True when the exponent fitted to each repeat's samples alone is above threshold."""
+    repeats = min(len(r[key]) for r in rows)
+    slopes = [growth_exponent([(r['size'], r[key][i]) for r in rows]) for i in range(repeats)]
+    return bool(slopes) and all(s is not None and s > threshold for s in slopes)
+
+
+def summarise(results):
+    """Return {stage: {'time_slope', 'memory_slope', 'superlinear'}}."""
+    summary = {}
+    for stage in dict.fromkeys(r['stage'] for r in results):
+        rows = sorted((r for r in results if r['stage'] == stage), key=lambda r: r['size'])
+        summary[stage] = {
+            'time_slope': growth_exponent([(r['size'], r['seconds']) for r in rows]),
+            'memory_slope': growth_exponent([(r['size'], r['peak_bytes']) for r in rows]),
+            'superlinear': (_consistently_above(rows, 'seconds_samples', SUPERLINEAR_SLOPE)
+                            or _consistently_above(rows, 'peak_samples', SUPERLINEAR_SLOPE)),
+        }
+    return summary
+
+
+def _fmt_slope(slope):
+    return "n/a" if slope is None else f"{slope:.2f}"
+
+
+def _bar(value, maximum, width=40):
+    return "#" * max(1, round(width * value / maximum)) if maximum else ""
+
+
+def report(results, summary):
+    """Return printable lines: a table and ASCII chart per stage, then the verdicts."""
+    lines = []
+    for stage, verdict in summary.items():
+        rows = [r for r in results if r['stage'] == stage]
+        max_seconds = max(r['seconds'] for r in rows)
+        max_peak = max(r['peak_bytes'] for r in rows)
+        lines.append("")
+        lines.append(f"{stage}  (time exponent {_fmt_slope(verdict['time_slope'])}, "
+                     f"memory exponent {_fmt_slope(verdict['memory_slope'])})")
+        lines.append(f"  {'size':>7}  {'time':>10}  {'per item':>9}  {'peak mem':>9}")
+        for r in rows:
+            lines.append(f"  {r['size']:>7}  {r['seconds'] * 1000:>8.2f}ms  "
+                         f"{r['seconds'] / r['size'] * 1e6:>7.1f}us  {r['peak_bytes'] / 1024:>7.0f}KB  "
+                         f"{_bar(r['seconds'], max_seconds)}")
+        lines.append(f"  {'':>7}  {'':>10}  {'':>9}  {'':>9}  memory:")
+        for r in rows:
+            lines.append(f"  {r['size']:>7}  {'':>10}  {'':>9}  {'':>9}  {_bar(r['peak_bytes'], max_peak)}")
+
+    lines.append("")
+    lines.append("=" * 50)
+    for stage, verdict in summary.items():
+        flag = "WORSE THAN LINEAR" if verdict['superlinear'] else "ok"
+        lines.append(f"{stage:<12} time {_fmt_slope(verdict['time_slope']):>5}  "
+                     f"memory {_fmt_slope(verdict['memory_slope']):>5}  {flag}")
+    lines.append("=" * 50)
+    return lines
+
+
+def write_csv(path, results):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=['stage', 'size', 'seconds', 'peak_bytes'], extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def plot(path, results):
+    """Save log-log time and memory plots per stage. Needs matplotlib."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(12, 5))
+    for stage in dict.fromkeys(r['stage'] for r in results):
+        rows = [r for r in results if r['stage'] == stage]
+        sizes = [r['size'] for r in rows]
+        ax_time.plot(sizes, [r['seconds'] for r in rows], marker="o", label=stage)
+        ax_mem.plot(sizes, [r['peak_bytes'] / 1024 for r in rows], marker="o", label=stage)
+    for ax, ylabel in ((ax_time, "seconds"), (ax_mem, "peak KB")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("inventory size")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, which="both", alpha=0.3)
+    ax_time.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the non-browser pipeline stages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--stages", nargs="+", choices=[name for name, _ in STAGES],
+                        help="stages to record (default: all)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--reserved-rate", type=float, default=0.05)
+    parser.add_argument("--photos", type=int, default=0, help="photos per car; enables the photos stage")
+    parser.add_argument("--filter", nargs="*", default=None, dest="filter_titles",
+                        help="filter titles (default: main.FILTER_TITLES)")
+    parser.add_argument("--exclude", nargs="*", default=None, dest="exclude_titles",
+                        help="exclude titles (default: main.EXCLUDE_TITLES)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--csv", help="also write the raw measurements to this CSV file")
+    parser.add_argument("--plot", help="also save a log-log chart to this image file (needs matplotlib)")
+    args = parser.parse_args(argv)
+
+    filter_titles = args.filter_titles if args.filter_titles is not None else main.FILTER_TITLES
+    exclude_titles = args.exclude_titles if args.exclude_titles is not None else main.EXCLUDE_TITLES
+    results = run(sorted(set(args.sizes)), args.stages, args.duplicate_rate, args.reserved_rate, args.photos,
+                  filter_titles or None, exclude_titles or None, args.repeats)
+    summary = summarise(results)
+    print("\n".join(report(results, summary)))
+    if args.csv:
+        write_csv(args.csv, results)
+        print(f"Measurements written to {args.csv}")
+    if args.plot:
+        try:
+            plot(args.plot, results)
+            print(f"Chart saved to {args.plot}")
+        except ImportError:
+            print("matplotlib is not installed; skipping --plot (the CSV and table above have the same data).")
+    return 1 if any(v['superlinear'] for v in summary.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(cli())
@@ -0,0 +1,171 @@
+"""
+locators.py — Central registry of the page elements the scraper and poster
+              look up, each with a ranked chain of fallback selectors.
+
+The selector that worked last time is remembered in locators.json and tried
+first, so when the site's markup drifts to a fallback the cost is one failed
+probe once, not on every car. Hit/miss counts per selector are kept in the
+same file; print report() to see which fallbacks are actually used.
+"""
+
+import json
+import os
+import tempfile
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+LOCATORS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locators.json")
+
+# Logical element -> selectors in order of preference.
+LOCATORS = {
+    'place_ad_link': [
+        (By.CSS_SELECTOR, "a[data-role='placeAd']"),
+    ],
+    'title_input': [
+        (By.ID, "title_nl-BE"),
+        (By.ID, "TextField-vulEenTitelIn"),
+    ],
+    'description_editor': [
+        (By.CSS_SELECTOR, "div.RichTextEditor-module-editorInput[contenteditable='true']"),
+        (By.CSS_SELECTOR, "div[class*='RichTextEditor'][contenteditable='true']"),
+    ],
+    'price_input': [
+        (By.XPATH, "//input[contains(@name, 'price.value')]"),
+    ],
+    'model_select': [
+        (By.XPATH, "//select[@name='singleSelectAttribute[model]']"),
+        (By.XPATH, "//select[@name='singleSelectAttribute[brand]']"),
+    ],
+    'category_submit': [
+        (By.CLASS_NAME, "CategorySelection-module-submitButton"),
+    ],
+    'image_uploader': [
+        (By.XPATH, "//input[contains(@id, 'imageUploader')]"),
+        (By.XPATH, "//input[@type='file' and contains(@accept, 'image')]"),
+    ],
+    'free_plan': [
+        (By.XPATH, "//label[@for='feature-FREE']"),
+        (By.XPATH, "//label[.//span[normalize-space(text())='Gratis']]"),
+        (By.XPATH, "//span[normalize-space(text())='Gratis']"),
+        (By.XPATH, "//*[@id='feature-bundles']//*[normalize-space(text())='Gratis']"),
+    ],
+    'submit_button': [
+        (By.XPATH, "//button[contains(@data-testid, 'place-listing-submit-button')]"),
+    ],
+}
+
+# Chains whose selectors are alternatives by page type rather than markup drift:
+# always tried in the listed order and never reordered by the last hit.
+# model_select: the model select when the category has one, else the brand select.
+FIXED_ORDER = {'model_select'}
+
+_state = None   # {name: {'last': selector, 'hits': {selector: n}, 'misses': {selector: n}}}
+
+
+def _key(selector):
+    by, value = selector
+    return f"{by}={value}"
+
+
+def _load():
+    global _state
+    if _state is None:
+        try:
+            with open(LOCATORS_FILE, encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+
+def save():
+    """Write the last-working selectors and hit/miss stats to disk."""
+    if _state is None:
+        return
+    # A temp file per call: several worker processes may save at the same time
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(prefix="locators.", suffix=".tmp", dir=os.path.dirname(LOCATORS_FILE))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(_state, f, indent=2)
+        os.replace(tmp, LOCATORS_FILE)
+    except OSError as e:
+        # e.g. PermissionError on Windows while another worker replaces the file
+        print(f"      Warning: could not save locator stats ({e})")
+        if tmp:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def _chain(name):
+    """Return the selectors for name, last working one first."""
+    selectors = LOCATORS[name]
+    if name in FIXED_ORDER:
+        return selectors
+    last = _load().get(name, {}).get('last')
+    return sorted(selectors, key=lambda s: _key(s) != last)
+
+
+def _record(name, selector, hit):
+    entry = _load().setdefault(name, {'last': None, 'hits': {}, 'misses': {}})
+    counts = entry['hits'] if hit else entry['misses']
+    counts[_key(selector)] = counts.get(_key(selector), 0) + 1
+    if hit and name not in FIXED_ORDER and entry['last'] != _key(selector):
+        if entry['last']:
+            print(f"      Locator '{name}' now matches via fallback {_key(selector)}")
+        entry['last'] = _key(selector)
+        save()
+
+
+def _try_chain(driver, name, record_misses=True):
+    for selector in _chain(name):
+        elements = driver.find_elements(*selector)
+        if elements:
+            _record(name, selector, True)
+            return elements
+        if record_misses:
+            _record(name, selector, False)
+    return []
+
+
+def find(driver, name):
+    """Return the first element for a logical name. Raises NoSuchElementException."""
+    elements = _try_chain(driver, name)
+    if not elements:
+        raise NoSuchElementException(f"No selector for '{name}' matched: {[_key(s) for s in LOCATORS[name]]}")
+    return elements[0]
+
+
+def find_all(driver, name):
+    """Return all elements matched by the first working selector for name (may be empty)."""
+    return _try_chain(driver, name)
+
+
+def wait_for(driver, name, timeout):
+    """Wait up to timeout seconds for any selector of name to match. Raises TimeoutException."""
+    try:
+        # Misses while the page is still loading are not markup drift — don't count them
+        return WebDriverWait(driver, timeout).until(lambda d: _try_chain(d, name, record_misses=False))[0]
+    except TimeoutException:
+        raise TimeoutException(f"No selector for '{name}' matched within {timeout}s")
+
+
+def report():
+    """Return printable lines with hit/miss stats per logical element."""
+    lines = []
+    for name, entry in sorted(_load().items()):
+        order = "fixed order" if name in FIXED_ORDER else f"last working {entry.get('last')}"
+        lines.append(f"{name}: {order}")
+        for selector in LOCATORS.get(name, []):
+            key = _key(selector)
+            lines.append(f"    hits {entry['hits'].get(key, 0):>6}  misses {entry['misses'].get(key, 0):>6}  {key}")
+    return lines
+
+
+if __name__ == "__main__":
+    print("\n".join(report()) or "No locator stats recorded yet.")
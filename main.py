@@ -15,21 +15,38 @@ Examples:
     FILTER_TITLES = []                            # run all
     FILTER_TITLES = ["peugeot partner"]           # run only Peugeot Partners
     FILTER_TITLES = ["opel combo", "hyundai"]     # run Opels and Hyundais
+
+To post cars from an edited inventory export (see inventory.py) without scraping:
+    python main.py --import inventory.csv
+
+To split a run over several processes, start each with its own worker number:
+    python main.py --worker 1
+    python main.py --worker 2
 """
 
+import argparse
 import datetime
 import os
 import subprocess
 import sys
 import time
+from collections import Counter
 
+import psutil
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+import history
+import inventory
+import locators
+import network
 import scraper
 import poster
+import profiling
+import workqueue
+from models import CarData
 
 
 # ---------------------------------------------------------------------------
@@ -50,6 +67,27 @@ DELETE_AFTER_POST = True
 # Set to None to upload all photos, or a number (e.g. 1) to limit uploads for faster testing.
 MAX_PHOTOS = None
 
+# How many times post_listing may reopen a fresh form once a step has used up its
+# in-place retries (see POST_STEPS in poster.py). 0 = abandon the car right away.
+POST_RESTARTS = 1
+
+# Browser recycling between cars, to keep Chrome's memory bounded on long runs.
+# RECYCLE_MODE: "tab" swaps in a fresh tab, "browser" restarts Chrome on the same profile.
+# Recycling triggers after RECYCLE_EVERY_CARS cars or once Chrome's processes together
+# (browser, renderers, GPU, utilities) use more than RECYCLE_MEMORY_MB of private memory.
+# Set either trigger to None to disable it.
+RECYCLE_MODE       = "tab"
+RECYCLE_EVERY_CARS = 10
+RECYCLE_MEMORY_MB  = 1500
+
+# Block ads, trackers, analytics and fonts via DevTools (patterns in network.py).
+# Set to False if a page stops working and blocking is suspected.
+BLOCK_RESOURCES = True
+
+# Count and time every WebDriver command per call site and print a report at the
+# end of the run (see profiling.py). Adds a little overhead per command.
+PROFILE_WEBDRIVER = False
+
 # Text appended to every listing description.
 DESC_FOOTER = (
     "\n\nMeer Info 0485/673404\n"
@@ -67,12 +105,29 @@ DEBUG_PORT     = 2222
 DASHBOARD_URL  = 'https://www.2dehands.be/my-account/sell/index.html'
 REPORT_FILE    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report.log")
 
+# Multi-process runs: start several copies with `python main.py --worker N`
+# (N = 1, 2, ...). Workers share the work queue in workqueue.py and each one uses
+# its own Chrome profile (USER_DATA_DIR + "_wN") and port (DEBUG_PORT + N).
+# WORK_QUEUE_NAME groups the workers of one run; None means today's date.
+WORKER_ID       = None
+WORK_QUEUE_NAME = None
+
 
 # ---------------------------------------------------------------------------
 # Chrome helpers
 # ---------------------------------------------------------------------------
 
 def kill_chrome():
+    if WORKER_ID is not None:
+        # Other workers' browsers are running too — only kill the one on our port.
+        ps = (
+            "Get-CimInstance Win32_Process -Filter \"name='chrome.exe'\" | "
+            f"Where-Object {{ $_.CommandLine -like '*--remote-debugging-port={DEBUG_PORT} *' }} | "
+            "Invoke-CimMethod -MethodName Terminate | Out-Null"
+        )
+        subprocess.run(['powershell', '-NoProfile', '-Command', ps])
+        print(f"Killed Chrome on port {DEBUG_PORT}.")
+        return
     try:
         subprocess.run(['TASKKILL', '/IM', 'chrome.exe', '/F'], check=True, shell=True)
         print("Killed existing Chrome instances.")
@@ -80,6 +135,15 @@ def kill_chrome():
         pass  # no Chrome was running
 
 
+def configure_worker(worker_id, queue_name=None):
+    """Switch this process to worker mode with its own Chrome profile and port."""
+    global WORKER_ID, WORK_QUEUE_NAME, DEBUG_PORT, USER_DATA_DIR
+    WORKER_ID = worker_id
+    WORK_QUEUE_NAME = queue_name or WORK_QUEUE_NAME or datetime.date.today().isoformat()
+    DEBUG_PORT += worker_id
+    USER_DATA_DIR = f"{USER_DATA_DIR}_w{worker_id}"
+
+
 def launch_chrome():
     cmd = (
         f'"{CHROME_PATH}" '
@@ -96,23 +160,286 @@ def launch_chrome():
 def connect_driver():
     options = Options()
     options.debugger_address = f"127.0.0.1:{DEBUG_PORT}"
+    network.enable_perf_log(options)
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=options)
+    if PROFILE_WEBDRIVER:
+        profiling.instrument(driver)
+    prepare_tab(driver)
+    time.sleep(3)
+    return driver
+
+
+def prepare_tab(driver):
+    """Apply the per-tab DevTools setup. Must be re-run whenever a new tab is attached."""
     # Hide the webdriver flag from JavaScript on every new page
     driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
         "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
     })
-    time.sleep(3)
+    if BLOCK_RESOURCES:
+        network.apply_blocking(driver)
+
+
+# ---------------------------------------------------------------------------
+# Browser recycling
+# ---------------------------------------------------------------------------
+
+def chrome_processes():
+    """Return the psutil processes of the Chrome instance on DEBUG_PORT: the browser and all its children."""
+    flag = f"--remote-debugging-port={DEBUG_PORT}"
+    for proc in psutil.process_iter(['cmdline']):
+        cmdline = proc.info['cmdline'] or []
+        # Only the browser process carries the flag without a --type= (renderer, gpu-process, ...)
+        if flag in cmdline and not any(arg.startswith("--type=") for arg in cmdline):
+            try:
+                return [proc] + proc.children(recursive=True)
+            except psutil.Error:
+                return [proc]
+    return []
+
+
+def _private_mb(proc):
+    """Private (non-shared) memory of a process in MB; RSS where the platform has no private figure."""
+    info = proc.memory_info()
+    return getattr(info, 'private', info.rss) / (1024 * 1024)
+
+
+def read_memory(driver):
+    """
+    Read memory usage of the Chrome instance and the current tab.
+    Returns a dict with 'process_mb' (all Chrome processes together, None if
+    they could not be found), 'processes', 'heap_used_mb', 'heap_total_mb',
+    'nodes', 'documents' and 'tabs', or None if the tab metrics could not be read.
+    """
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        tabs = len(driver.window_handles)
+    except Exception as e:
+        print(f"  Warning: could not read browser memory: {e}")
+        return None
+    values = {m["name"]: m["value"] for m in metrics}
+
+    process_mb = None
+    procs = chrome_processes()
+    if procs:
+        process_mb = 0.0
+        for proc in procs:
+            try:
+                process_mb += _private_mb(proc)
+            except psutil.Error:
+                pass  # process exited in the meantime
+
+    return {
+        'process_mb':    process_mb,
+        'processes':     len(procs),
+        'heap_used_mb':  values.get("JSHeapUsedSize", 0) / (1024 * 1024),
+        'heap_total_mb': values.get("JSHeapTotalSize", 0) / (1024 * 1024),
+        'nodes':         int(values.get("Nodes", 0)),
+        'documents':     int(values.get("Documents", 0)),
+        'tabs':          tabs,
+    }
+
+
+def format_memory(mem):
+    if not mem:
+        return "n/a"
+    chrome = (f"Chrome {mem['process_mb']:.0f} MB in {mem['processes']} process(es)"
+              if mem['process_mb'] is not None else "Chrome processes not found")
+    return (f"{chrome} | JS heap {mem['heap_used_mb']:.0f}/{mem['heap_total_mb']:.0f} MB | "
+            f"DOM nodes {mem['nodes']} | documents {mem['documents']} | tabs {mem['tabs']}")
+
+
+def recycle_reason(cars_since_recycle, mem):
+    """Return a human-readable reason to recycle the browser now, or None."""
+    if RECYCLE_EVERY_CARS and cars_since_recycle >= RECYCLE_EVERY_CARS:
+        return f"{cars_since_recycle} car(s) since last recycle"
+    if RECYCLE_MEMORY_MB and mem and mem['process_mb'] is not None and mem['process_mb'] >= RECYCLE_MEMORY_MB:
+        return f"Chrome memory {mem['process_mb']:.0f} MB >= {RECYCLE_MEMORY_MB} MB"
+    return None
+
+
+def recycle_tab(driver):
+    """Open a fresh tab, close every other tab and continue in the new one."""
+    old_handles = list(driver.window_handles)
+    driver.switch_to.new_window('tab')
+    new_handle = driver.current_window_handle
+    for handle in old_handles:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(new_handle)
+    prepare_tab(driver)
     return driver
 
 
+def recycle_browser(driver):
+    """Restart Chrome on the same (logged-in) profile and reconnect."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    kill_chrome()
+    launch_chrome()
+    return connect_driver()
+
+
+def recycle(driver, mode=None):
+    """
+    Recycle the tab or the whole browser according to RECYCLE_MODE.
+    A failed tab recycle falls back to a full browser restart.
+    Returns the (possibly new) driver.
+    """
+    mode = mode or RECYCLE_MODE
+    if mode == "tab":
+        try:
+            return recycle_tab(driver)
+        except Exception as e:
+            print(f"  Warning: tab recycle failed ({e}), restarting browser instead.")
+    return recycle_browser(driver)
+
+
+# ---------------------------------------------------------------------------
+# Per-car steps (shared by main() and daemon.py)
+# ---------------------------------------------------------------------------
+
+def scrape_car(driver, edit_url):
+    """Scrape one listing. Raises if nothing could be scraped."""
+    history.mark_step("scrape")
+    car = scraper.scrape_one_listing(driver, edit_url)
+    if not car:
+        raise Exception("Scraping returned no data.")
+    return car
+
+
+def post_car(driver, car):
+    """Post a fresh copy of the scraped car."""
+    poster.post_listing(driver, car, max_photos=MAX_PHOTOS, desc_footer=DESC_FOOTER,
+                        restarts=POST_RESTARTS)
+    time.sleep(2)
+
+
+def delete_original(driver, car):
+    """Delete the original listing after its copy was posted (if DELETE_AFTER_POST)."""
+    if DELETE_AFTER_POST:
+        history.mark_step("delete")
+        poster.delete_old_listing(driver, car)
+    else:
+        print(f"  Skipping delete (DELETE_AFTER_POST=False).")
+
+
+def between_cars(driver, cars_since_recycle, is_last=False):
+    """
+    Log the network and memory readings for the car just processed and recycle
+    the browser if it is due. Returns (driver, page_stats, recycled); the
+    driver is a new one after a recycle.
+    """
+    page_stats = network.page_stats(driver)
+    for line in network.format_page_stats(page_stats):
+        print(f"  Network: {line}")
+
+    mem = read_memory(driver)
+    print(f"  Memory: {format_memory(mem)}")
+    reason = recycle_reason(cars_since_recycle, mem) if not is_last else None
+    if not reason:
+        return driver, page_stats, False
+    print(f"  Recycling browser ({RECYCLE_MODE}): {reason}")
+    driver = recycle(driver)
+    print(f"  Memory after recycle: {format_memory(read_memory(driver))}")
+    return driver, page_stats, True
+
+
+def drop_duplicate_titles(items):
+    """
+    Split (title, url) items into those with a unique title and those whose
+    title appears more than once (ambiguous to delete, so never processed).
+    Returns (unique_items, duplicate_items).
+    """
+    title_counts = Counter(title for title, _ in items)
+    unique = [(title, url) for title, url in items if title_counts[title] == 1]
+    duplicates = [(title, url) for title, url in items if title_counts[title] > 1]
+    return unique, duplicates
+
+
+def check_import_record(car, dashboard_ids):
+    """
+    Raise if an imported record cannot be reposted safely: its photo folder is
+    gone (photos are archived after every post, so a CSV used twice has none)
+    or, when originals are deleted, its original is no longer on the dashboard
+    (a stale export would otherwise post a duplicate).
+    """
+    if car.var_picspath and not poster.photo_files(car.var_picspath):
+        raise Exception(f"Photo folder is missing or empty: {car.var_picspath} "
+                        f"(already posted and archived to photos/old?) — not posting.")
+    if DELETE_AFTER_POST and listing_id_from_url(car.edit_url) not in dashboard_ids:
+        raise Exception(f"Original listing {listing_id_from_url(car.edit_url) or '(no edit_url)'} "
+                        f"is no longer on the dashboard (stale export?) — not posting.")
+
+
+def listing_id_from_url(url):
+    """Return the listing ID (e.g. 'm2372621653') from a seller view / edit URL."""
+    return url.rstrip('/').split('/')[-1]
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
+def build_report_lines(scrape_stats, cars_added, total_to_process, cars_duplicates, cars_errors,
+                       requests_total=0, blocked_total=0, recycles=0, import_file=None):
+    """Build the end-of-run summary printed to the console and appended to REPORT_FILE."""
+    lines = []
+    lines.append("=" * 50)
+    lines.append(f"Run: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if import_file:
+        lines.append(f"Imported from               : {import_file}")
+    if WORKER_ID is not None:
+        lines.append(f"Worker                      : {WORKER_ID} (queue '{WORK_QUEUE_NAME}')")
+    lines.append("=" * 50)
+    lines.append(f"Filter titles               : {len(FILTER_TITLES)} ({', '.join(FILTER_TITLES) if FILTER_TITLES else 'all'})")
+    if not FILTER_TITLES:
+        lines.append(f"Total listings on dashboard : {scrape_stats['total']}")
+    lines.append(f"Skipped (Gereserveerd)      : {scrape_stats['reserved']}")
+    if EXCLUDE_TITLES and scrape_stats['skipped']:
+        lines.append(f"Skipped (excluded)          : {scrape_stats['skipped']}")
+    lines.append(f"Successfully added          : {cars_added}")
+    if BLOCK_RESOURCES and requests_total:
+        lines.append(f"Requests blocked            : {blocked_total} of {requests_total}")
+    if recycles:
+        lines.append(f"Browser recycles            : {recycles}")
+    if cars_duplicates:
+        lines.append(f"Skipped (duplicate title)   : {len(cars_duplicates)}")
+        for title in cars_duplicates:
+            lines.append(f"  - {title}")
+    if cars_errors:
+        lines.append(f"Errors                      : {len(cars_errors)}")
+        for title, err in cars_errors:
+            lines.append(f"  - {title}")
+            lines.append(f"    {err}")
+    if cars_added < total_to_process:
+        missing = total_to_process - cars_added
+        lines.append("")
+        lines.append(f"WARNING: {missing} car(s) were not re-posted successfully.")
+        lines.append(f"         The dashboard may have fewer listings than before the run!")
+    lines.append("=" * 50)
+    return lines
+
+
+def _claimed_items(conn, worker):
+    """Yield work items claimed from the shared queue until it is empty."""
+    while True:
+        item = workqueue.claim(conn, WORK_QUEUE_NAME, worker)
+        if item is None:
+            return
+        yield item
+
+
+def main(import_file=None):
     print("=== jbcars_auto ===")
-    if FILTER_TITLES:
+    if WORKER_ID is not None:
+        print(f"Worker {WORKER_ID} | queue '{WORK_QUEUE_NAME}' | port {DEBUG_PORT} | profile {USER_DATA_DIR}")
+    if import_file:
+        print(f"Importing cars from {import_file} — dashboard filters are not used.")
+    elif FILTER_TITLES:
         print(f"Filter active: only processing listings matching {FILTER_TITLES}")
     else:
         print("No filter set — processing ALL active listings.")
@@ -120,103 +447,144 @@ def main():
     kill_chrome()
     launch_chrome()
     driver = connect_driver()
+    history.start_run([f"import:{import_file}"] if import_file else FILTER_TITLES)
 
     cars_added = 0
     total_to_process = 0
     cars_errors = []       # list of (title, error_message)
     cars_duplicates = []   # list of titles that appeared more than once
     scrape_stats = {'total': 0, 'reserved': 0, 'skipped': 0}
+    cars_since_recycle = 0
+    recycles = 0
+    blocked_total = 0
+    requests_total = 0
+    queue_conn = None
+    heartbeat = None
+    dashboard_ids = set()
+    worker = workqueue.worker_name(WORKER_ID) if WORKER_ID is not None else None
 
     try:
-        # Step 1: Collect filtered listing items from dashboard (no scraping yet)
-        items, scrape_stats = scraper.collect_listings(
-            driver,
-            filter_titles=FILTER_TITLES if FILTER_TITLES else None,
-            exclude_titles=EXCLUDE_TITLES if EXCLUDE_TITLES else None,
-        )
-
-        if not items:
-            print("No listings to process. Exiting.")
-            return
-
-        # Detect duplicate titles and remove them from the processing list
-        from collections import Counter
-        title_counts = Counter(title for title, _ in items)
-        duplicate_titles = {t for t, c in title_counts.items() if c > 1}
-        if duplicate_titles:
-            for t in duplicate_titles:
+        if import_file:
+            # Records come from an edited inventory export — post them without scraping
+            dashboard_ids = scraper.dashboard_listing_ids(driver) if DELETE_AFTER_POST else set()
+            print(f"\n--- Posting cars from {import_file} ---\n")
+            work = ({'title': car.var_title, 'edit_url': car.edit_url, 'attempts': 1,
+                     'posted': False, 'car': car} for car in inventory.read_records(import_file))
+        else:
+            # Step 1: Collect filtered listing items from dashboard (no scraping yet)
+            items, scrape_stats = scraper.collect_listings(
+                driver,
+                filter_titles=FILTER_TITLES if FILTER_TITLES else None,
+                exclude_titles=EXCLUDE_TITLES if EXCLUDE_TITLES else None,
+            )
+
+            if not items:
+                print("No listings to process. Exiting.")
+                return
+
+            # Detect duplicate titles and remove them from the processing list
+            items, duplicates = drop_duplicate_titles(items)
+            for t in dict.fromkeys(title for title, _ in duplicates):
                 print(f"  SKIP (duplicate title): {t}")
                 cars_duplicates.append(t)
-            items = [(title, url) for title, url in items if title not in duplicate_titles]
-
-        if not items:
-            print("No listings to process after duplicate check. Exiting.")
-            return
-
-        total_to_process = len(items)
-        print(f"\n--- Processing {total_to_process} car(s) one by one ---\n")
-
-        for i, (title, edit_url) in enumerate(items, start=1):
-            print(f"[{i}/{len(items)}] {title}")
+            for title, url in duplicates:
+                history.record_skipped(listing_id_from_url(url), title, "duplicate title")
+
+            if not items:
+                print("No listings to process after duplicate check. Exiting.")
+                return
+
+            if worker is None:
+                total_to_process = len(items)
+                work = [{'title': t, 'edit_url': u, 'attempts': 1, 'posted': False} for t, u in items]
+                print(f"\n--- Processing {total_to_process} car(s) one by one ---\n")
+            else:
+                queue_conn = workqueue.connect()
+                added = workqueue.enqueue(queue_conn, WORK_QUEUE_NAME, items)
+                queued = sum(workqueue.counts(queue_conn, WORK_QUEUE_NAME).values())
+                print(f"\n--- Work queue '{WORK_QUEUE_NAME}': {added} new, {queued} total ---\n")
+                heartbeat = workqueue.start_heartbeat(WORK_QUEUE_NAME, worker)
+                work = _claimed_items(queue_conn, worker)
+
+        for i, item in enumerate(work, start=1):
+            title, edit_url = item['title'], item['edit_url']
+            if import_file:
+                total_to_process += 1
+                print(f"[{i}] {title}")
+                is_last = False
+            elif worker is None:
+                print(f"[{i}/{len(items)}] {title}")
+                is_last = i == len(items)
+            else:
+                total_to_process += 1
+                print(f"[{i}] {title} (attempt {item['attempts']})")
+                is_last = False
+            history.start_listing(listing_id_from_url(edit_url), title)
             try:
-                # Scrape this single car
-                car = scraper.scrape_one_listing(driver, edit_url)
-                if not car:
-                    raise Exception("Scraping returned no data.")
-
-                # Post new listing
-                poster.post_listing(driver, car, max_photos=MAX_PHOTOS, desc_footer=DESC_FOOTER)
-                time.sleep(2)
-
-                # Delete old listing
-                if DELETE_AFTER_POST:
-                    poster.delete_old_listing(driver, car)
+                posted = item['posted']
+                if not posted and item['attempts'] > 1:
+                    # A previous worker may have submitted the new listing before dying:
+                    # look for a listing with exactly this title but another ID.
+                    driver.get(DASHBOARD_URL)
+                    time.sleep(3)
+                    posted = any(listing_id != listing_id_from_url(edit_url)
+                                 for listing_id in scraper.listing_ids_for_title(driver, title))
+
+                if posted:
+                    print(f"  New listing already posted by an earlier attempt — only deleting the original.")
+                    car = CarData(var_title=title, edit_url=edit_url)
+                elif 'car' in item:
+                    car = item['car']
+                    check_import_record(car, dashboard_ids)
+                    post_car(driver, car)
                 else:
-                    print(f"  Skipping delete (DELETE_AFTER_POST=False).")
+                    car = scrape_car(driver, edit_url)
+                    post_car(driver, car)
+                    if worker is not None:
+                        workqueue.mark_posted(queue_conn, WORK_QUEUE_NAME, title, worker)
+
+                delete_original(driver, car)
 
                 cars_added += 1
+                history.end_listing('ok')
+                if worker is not None:
+                    workqueue.complete(queue_conn, WORK_QUEUE_NAME, title, worker, 'done')
                 print(f"  Done.\n")
             except Exception as e:
                 print(f"  ERROR: {e}")
                 cars_errors.append((title, str(e)))
+                history.end_listing('failed', str(e))
+                if worker is not None:
+                    workqueue.complete(queue_conn, WORK_QUEUE_NAME, title, worker, 'failed', str(e))
                 print("  Continuing with next car...\n")
 
-            # Return to dashboard for next car
-            driver.get('https://www.2dehands.be/my-account/sell/index.html')
-            time.sleep(3)
+            cars_since_recycle += 1
+            driver, page_stats, recycled = between_cars(driver, cars_since_recycle, is_last)
+            requests_total += sum(s['requests'] for s in page_stats.values())
+            blocked_total += sum(s['blocked'] for s in page_stats.values())
+            if recycled:
+                cars_since_recycle = 0
+                recycles += 1
 
     finally:
-        driver.quit()
+        if heartbeat:
+            heartbeat.set()
+        if queue_conn:
+            queue_conn.close()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        history.end_run(total_to_process, cars_added, len(cars_errors))
+        locators.save()
 
         # Build summary lines (printed to console and appended to report file)
-        lines = []
-        lines.append("=" * 50)
-        lines.append(f"Run: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append("=" * 50)
-        lines.append(f"Filter titles               : {len(FILTER_TITLES)} ({', '.join(FILTER_TITLES) if FILTER_TITLES else 'all'})")
-        if not FILTER_TITLES:
-            lines.append(f"Total listings on dashboard : {scrape_stats['total']}")
-        lines.append(f"Skipped (Gereserveerd)      : {scrape_stats['reserved']}")
-        if EXCLUDE_TITLES and scrape_stats['skipped']:
-            lines.append(f"Skipped (excluded)          : {scrape_stats['skipped']}")
-        lines.append(f"Successfully added          : {cars_added}")
-        if cars_duplicates:
-            lines.append(f"Skipped (duplicate title)   : {len(cars_duplicates)}")
-            for title in cars_duplicates:
-                lines.append(f"  - {title}")
-        if cars_errors:
-            lines.append(f"Errors                      : {len(cars_errors)}")
-            for title, err in cars_errors:
-                lines.append(f"  - {title}")
-                lines.append(f"    {err}")
-        if cars_added < total_to_process:
-            missing = total_to_process - cars_added
-            lines.append("")
-            lines.append(f"WARNING: {missing} car(s) were not re-posted successfully.")
-            lines.append(f"         The dashboard may have fewer listings than before the run!")
-        lines.append("=" * 50)
+        lines = build_report_lines(scrape_stats, cars_added, total_to_process, cars_duplicates, cars_errors,
+                                   requests_total, blocked_total, recycles, import_file)
 
         print("\n" + "\n".join(lines))
+        if PROFILE_WEBDRIVER:
+            print("\n" + "\n".join(profiling.report()))
         print("=== Finished ===")
 
         with open(REPORT_FILE, "a", encoding="utf-8") as f:
@@ -224,4 +592,14 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Repost 2dehands.be listings.")
+    parser.add_argument("--worker", type=int, help="run as worker N on the shared work queue")
+    parser.add_argument("--queue", help="work queue name (default: today's date)")
+    parser.add_argument("--import", dest="import_file", metavar="CSV",
+                        help="post cars from an inventory.py export instead of scraping the dashboard")
+    args = parser.parse_args()
+    if args.worker is not None and args.import_file:
+        parser.error("--import cannot be combined with --worker")
+    if args.worker is not None:
+        configure_worker(args.worker, args.queue)
+    main(import_file=args.import_file)
@@ -0,0 +1,188 @@
+"""
+network.py — Blocks ads, trackers, analytics, fonts and other third-party
+             resources through DevTools, and reports per-page request stats.
+
+Blocking uses CDP Network.setBlockedURLs, which is per tab: call
+apply_blocking() on every tab the driver attaches to.
+"""
+
+import json
+from collections import defaultdict
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+
+
+# Wildcard URL patterns (CDP syntax: '*' matches anything) that are never
+# needed to read or fill the listing forms.
+BLOCKED_URL_PATTERNS = [
+    # Ads
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*adservice.google.*",
+    "*amazon-adsystem.com*",
+    "*criteo.com*",
+    "*criteo.net*",
+    "*adnxs.com*",
+    "*rubiconproject.com*",
+    "*pubmatic.com*",
+    "*casalemedia.com*",
+    "*smartadserver.com*",
+    "*teads.tv*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    # Analytics / trackers
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googletagservices.com*",
+    "*hotjar.com*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*bat.bing.com*",
+    "*clarity.ms*",
+    "*scorecardresearch.com*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+    "*sentry.io*",
+    "*optimizely.com*",
+    "*tiqcdn.com*",
+    # Fonts
+    "*fonts.googleapis.com*",
+    "*fonts.gstatic.com*",
+    "*.woff2",
+    "*.woff",
+    "*.ttf",
+]
+
+# URLs that must always load. Any blocked pattern matching one of these is
+# dropped before blocking is applied, so a too-broad pattern can never break
+# the dashboard, the forms or the image upload.
+ALLOWED_URLS = [
+    "https://www.2dehands.be/my-account/sell/index.html",
+    "https://www.2dehands.be/plaats",
+    "https://www.2dehands.be/seller/view/m0000000000",
+    "https://www.2dehands.be/v/auto-s/brand/m0000000000-slug",
+    "https://www.2dehands.be/syi/api/images/upload",
+    "https://images.2dehands.be/api/v1/listings/images",
+]
+
+
+def effective_patterns(blocked=None, allowed=None):
+    """
+    Return the blocked patterns that do not match any allow-listed URL.
+    Patterns that would block an allow-listed URL are reported and dropped.
+    """
+    blocked = BLOCKED_URL_PATTERNS if blocked is None else blocked
+    allowed = ALLOWED_URLS if allowed is None else allowed
+    patterns = []
+    for pattern in blocked:
+        hits = [url for url in allowed if fnmatch(url, pattern)]
+        if hits:
+            print(f"  Warning: not blocking '{pattern}' — it matches allow-listed {hits[0]}")
+            continue
+        patterns.append(pattern)
+    return patterns
+
+
+def apply_blocking(driver, blocked=None, allowed=None):
+    """Enable request blocking on the driver's current tab. Returns the applied patterns."""
+    patterns = effective_patterns(blocked, allowed)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return patterns
+
+
+def clear_blocking(driver):
+    """Disable request blocking on the driver's current tab."""
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+
+
+# ---------------------------------------------------------------------------
+# Per-page stats (from the chromedriver performance log)
+# ---------------------------------------------------------------------------
+
+def enable_perf_log(options):
+    """Ask chromedriver to record DevTools network events (needed for page_stats)."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+# Entries drained by read_perf_log() but not yet summarised by page_stats().
+_log_buffer = []
+
+
+def read_perf_log(driver):
+    """
+    Drain new performance log entries and return them.
+    chromedriver hands each entry out only once, so a copy is kept for page_stats().
+    Returns [] if the performance log is not available.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    _log_buffer.extend(entries)
+    return entries
+
+
+def iter_events(entries):
+    """Yield (method, params) for each DevTools event in performance log entries."""
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        yield message.get("method", ""), message.get("params", {})
+
+
+def page_stats(driver):
+    """
+    Summarise network activity per page since the previous call.
+
+    Returns a dict keyed by page URL (without query string) with:
+      'requests'     : requests issued by the page
+      'blocked'      : requests blocked by Network.setBlockedURLs
+      'bytes'        : bytes actually transferred
+      'blocked_hosts': {host: count} of blocked requests
+    Returns {} if the performance log is not available.
+    """
+    read_perf_log(driver)
+    entries = list(_log_buffer)
+    _log_buffer.clear()
+    return summarise_perf_log(entries)
+
+
+def summarise_perf_log(entries):
+    pages = defaultdict(lambda: {'requests': 0, 'blocked': 0, 'bytes': 0,
+                                 'blocked_hosts': defaultdict(int)})
+    requests = {}   # requestId -> (page, url)
+
+    for method, params in iter_events(entries):
+        request_id = params.get("requestId")
+
+        if method == "Network.requestWillBeSent":
+            page = (params.get("documentURL") or "").split("?")[0]
+            url = params.get("request", {}).get("url", "")
+            if request_id not in requests:
+                pages[page]['requests'] += 1
+            requests[request_id] = (page, url)
+        elif method == "Network.loadingFinished" and request_id in requests:
+            page, _ = requests[request_id]
+            pages[page]['bytes'] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and request_id in requests:
+            if params.get("blockedReason") == "inspector":
+                page, url = requests[request_id]
+                pages[page]['blocked'] += 1
+                pages[page]['blocked_hosts'][urlparse(url).netloc] += 1
+
+    return {page: dict(stats, blocked_hosts=dict(stats['blocked_hosts']))
+            for page, stats in pages.items()}
+
+
+def format_page_stats(stats):
+    """Return one printable line per page."""
+    lines = []
+    for page, s in stats.items():
+        share = (100 * s['blocked'] / s['requests']) if s['requests'] else 0
+        lines.append(f"{page or '(unknown page)'}: {s['requests']} request(s), "
+                     f"{s['blocked']} blocked ({share:.0f}%), {s['bytes'] / 1024:.0f} KB loaded")
+    return lines
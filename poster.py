@@ -7,6 +7,7 @@ Logic adapted from jbcars/AddCars/general.py (addCarFunction / deleteCarFunction
 
 import os
 import random
+import shutil
 import time
 
 
@@ -21,6 +22,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 from models import CarData
+import history
+import locators
+import scraper
+import uploads
 
 
 DASHBOARD_URL = "https://www.2dehands.be/my-account/sell/index.html"
@@ -39,15 +44,61 @@ def listing_exists(driver, title):
         return False
 
 
-def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
+def post_listing(driver, car: CarData, max_photos=None, desc_footer="", restarts=1):
     """Add a new listing on 2dehands.be using the scraped CarData.
     max_photos: if set, only upload that many photos (None = all).
-    desc_footer: text appended to the description."""
+    desc_footer: text appended to the description.
+    restarts: how many times to reopen a fresh form after a step ran out of in-place retries.
+
+    The form is filled by the steps in POST_STEPS. A failing step is retried in
+    place on the same form (keeping e.g. the uploaded photos) up to its own retry
+    count; only then is the whole form restarted."""
+    ctx = {'max_photos': max_photos, 'desc_footer': desc_footer}
+
+    for attempt in range(1 + restarts):
+        if attempt:
+            print(f"      Restarting form from scratch (restart {attempt}/{restarts})")
+        done = []
+        try:
+            for name, step, retries, restartable in POST_STEPS:
+                history.mark_step(name)
+                _run_step(driver, car, ctx, name, step, retries)
+                done.append(name)
+            break
+        except Exception as e:
+            print(f"      Step '{name}' failed after {retries + 1} attempt(s): {e}")
+            if done:
+                print(f"      Completed steps: {', '.join(done)}")
+            if not restartable or attempt == restarts:
+                raise
+            time.sleep(_w(3))
+
+    print(f"    Posted new listing: '{car.var_title}'")
+    _archive_photos(car)
+
+
+def _run_step(driver, car, ctx, name, step, retries):
+    """Run one step, retrying it in place on the same form up to `retries` times."""
+    for attempt in range(1 + retries):
+        try:
+            return step(driver, car, ctx)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            print(f"      Warning: step '{name}' failed ({e.__class__.__name__}: {e}) — retrying in place")
+            time.sleep(_w(2 + 2 * attempt))
+
+
+# ---------------------------------------------------------------------------
+# Post steps
+# ---------------------------------------------------------------------------
+
+def _step_open_form(driver, car, ctx):
     driver.get(DASHBOARD_URL)
     time.sleep(_w(3))
 
     # Navigate to "Plaats zoekertje" form
-    plaats_link = driver.find_element(By.CSS_SELECTOR, "a[data-role='placeAd']")
+    plaats_link = locators.find(driver, 'place_ad_link')
     href = plaats_link.get_attribute('href')
     print(f"      Step: plaats zoekertje | href={href}")
     driver.get(href)
@@ -58,20 +109,23 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
     print(f"      Step: plaats zoekertje navigated | url={driver.current_url}")
     time.sleep(_w(7))
 
-    # --- Title ---
+
+def _step_title(driver, car, ctx):
     print(f"      Step: title | url={driver.current_url} | value={repr(car.var_title)}")
-    elem_title = WebDriverWait(driver, 15).until(
-        EC.presence_of_element_located((By.XPATH, "//input[@id='title_nl-BE' or @id='TextField-vulEenTitelIn']"))
-    )
+    elem_title = locators.wait_for(driver, 'title_input', 15)
     print(f"      Step: title element found, id={elem_title.get_attribute('id')}")
+    if elem_title.get_attribute('value') == car.var_title:
+        return
     time.sleep(_w(1))
+    # select() first so a retry replaces any partial text instead of appending
     driver.execute_script(
-        "arguments[0].focus(); document.execCommand('insertText', false, arguments[1]);",
+        "arguments[0].focus(); arguments[0].select(); document.execCommand('insertText', false, arguments[1]);",
         elem_title, car.var_title
     )
     time.sleep(_w(1))
 
-    # --- Category and brand (top-level dropdowns) ---
+
+def _step_category(driver, car, ctx):
     print(f"      Step: category/brand")
     select_cat = Select(driver.find_element(By.ID, 'cat_sel_1'))
     select_cat.select_by_visible_text(car.var_categorie)
@@ -81,78 +135,70 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
     select_brand.select_by_visible_text(car.var_brand if car.var_brand else "Bestelwagens en Lichte vracht")
     time.sleep(_w(1))
 
-    submit_btn = driver.find_element(By.CLASS_NAME, 'CategorySelection-module-submitButton')
+    submit_btn = locators.find(driver, 'category_submit')
     driver.execute_script("arguments[0].scrollIntoView({block:'center'});", submit_btn)
     time.sleep(0.3)
     driver.execute_script("arguments[0].click();", submit_btn)
     print(f"      Step: category submit clicked")
     time.sleep(_w(6))
 
-    # --- Photos (upload all at once) ---
+
+def _step_photos(driver, car, ctx):
+    """Upload all photos at once. Not retried in place: re-sending would add duplicates."""
     print(f"      Step: photos")
-    if car.var_picspath and os.path.isdir(car.var_picspath):
-        import shutil
-        all_files = []
-        for dirname, _, filenames in os.walk(car.var_picspath):
-            for filename in sorted(filenames):
-                if max_photos is not None and len(all_files) >= max_photos:
-                    break
-                all_files.append(os.path.join(dirname, filename))
-        if all_files:
-            time.sleep(_w(5))
-            upload_inputs = driver.find_elements(By.XPATH, "//input[contains(@id, 'imageUploader')]")
-            if not upload_inputs:
-                print(f"      Warning: image uploader not found, skipping photos")
-            else:
-                upload_input = upload_inputs[-1]
-                print(f"      Step: photos upload input found, sending {len(all_files)} file(s)")
-                upload_input.send_keys('\n'.join(all_files))
-            wait_secs = max(15, len(all_files) * 1.5)
-            time.sleep(_w(wait_secs))
-            print(f"      Photos sent: {len(all_files)}")
-        # Move the photo folder to photos/old/ only after confirmed upload
-        old_dir = os.path.join(os.path.dirname(car.var_picspath), "old")
-        os.makedirs(old_dir, exist_ok=True)
-        dest = os.path.join(old_dir, os.path.basename(car.var_picspath))
-        if os.path.exists(dest):
-            shutil.rmtree(dest)
-        shutil.move(car.var_picspath, dest)
-        print(f"      Moved photos to: {dest}")
+    if not (car.var_picspath and os.path.isdir(car.var_picspath)):
+        return
+    all_files = photo_files(car.var_picspath, ctx['max_photos'])
+    if all_files:
+        time.sleep(_w(5))
+        print(f"      Step: photos uploading {len(all_files)} file(s)")
+        report = uploads.upload_photos(driver, all_files)
+        for line in uploads.format_report(report):
+            print(f"        {line}")
+        failed = [e['file'] for e in report if e['status'] != 'ok']
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} of {len(all_files)} photo(s) failed to upload "
+                f"({', '.join(os.path.basename(f) for f in failed)}) — not posting an incomplete listing."
+            )
+        print(f"      Photos sent: {len(all_files)}")
         time.sleep(_w(2))
 
-    # --- Description ---
+
+def _step_description(driver, car, ctx):
     print(f"      Step: description")
-    elem_desc = driver.find_element(By.CSS_SELECTOR, "div.RichTextEditor-module-editorInput[contenteditable='true']")
+    elem_desc = locators.find(driver, 'description_editor')
+    desc_footer = ctx['desc_footer']
     footer_to_add = "" if (desc_footer and desc_footer.strip() in car.var_desc) else desc_footer
+    if elem_desc.text.strip():
+        # Left over from a failed attempt — clear it instead of appending
+        elem_desc.send_keys(Keys.CONTROL, 'a')
+        elem_desc.send_keys(Keys.DELETE)
     elem_desc.send_keys(car.var_desc + footer_to_add)
     time.sleep(_w(1))
 
-    # --- Website URL ---
+
+def _step_url(driver, car, ctx):
     print(f"      Step: url")
     try:
         elem_url = driver.find_element(By.XPATH, "//input[contains(@id, 'url')]")
-        elem_url.send_keys("www.jbcars.be")
+        _type_value(elem_url, "www.jbcars.be", click=False)
         time.sleep(_w(0.3))
     except NoSuchElementException:
         pass
 
-    # --- Model / brand sub-select ---
+
+def _step_model(driver, car, ctx):
     print(f"      Step: model")
-    elem_model = None
-    try:
-        elem_model = driver.find_element(By.XPATH, "//select[@name='singleSelectAttribute[model]']")
-    except NoSuchElementException:
-        try:
-            elem_model = driver.find_element(By.XPATH, "//select[@name='singleSelectAttribute[brand]']")
-        except NoSuchElementException:
-            pass
+    elem_model = next(iter(locators.find_all(driver, 'model_select')), None)
     if elem_model and car.var_model:
         elem_model.click()
         elem_model.send_keys(car.var_model)
         elem_model.send_keys(Keys.TAB)
         time.sleep(_w(0.5))
 
-    # --- Single-select attributes ---
+
+def _step_selects(driver, car, ctx):
     print(f"      Step: selects")
     _set_select(driver, "singleSelectAttribute[priceType]",     car.var_pricetype)
     _set_select(driver, "singleSelectAttribute[fuel]",          car.var_gas)
@@ -166,7 +212,8 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
     _set_select(driver, "singleSelectAttribute[driveTrain]",    car.var_drivetrain)
     _set_select(driver, "singleSelectAttribute[warranty]",      car.var_warranty)
 
-    # --- Numeric attributes ---
+
+def _step_numerics(driver, car, ctx):
     print(f"      Step: numerics")
     _set_numeric(driver, "numericAttribute[constructionYear]",   car.var_year)
     _set_numeric(driver, "numericAttribute[co2emission]",        car.var_co2)
@@ -179,7 +226,8 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
     _set_numeric(driver, "numericAttribute[towingWeightBrakes]", car.var_towingbraked)
     _set_numeric(driver, "numericAttribute[towingWeightNoBrakes]", car.var_towingunbraked)
 
-    # --- Options (checkboxes) ---
+
+def _step_options(driver, car, ctx):
     print(f"      Step: options")
     # We use the raw form values scraped directly from the edit page, so no mapping needed.
     if car.var_options:
@@ -195,15 +243,16 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
             except NoSuchElementException:
                 print(f"    Warning: option not found on form: '{opt_value}'")
 
-    # --- Price ---
+
+def _step_price(driver, car, ctx):
     print(f"      Step: price")
-    elem_price = driver.find_element(By.XPATH, "//input[contains(@name, 'price.value')]")
-    elem_price.click()
-    elem_price.send_keys(car.var_price)
-    elem_price.send_keys(Keys.TAB)
+    elem_price = locators.find(driver, 'price_input')
+    _type_value(elem_price, car.var_price)
     time.sleep(_w(0.5))
 
-    # --- Disable bidding toggle ---
+
+def _step_bidding(driver, car, ctx):
+    """Disable the bidding toggle. Not retried in place: a second click would re-enable it."""
     print(f"      Step: bidding")
     try:
         elem_bid = driver.find_element(By.XPATH, "//div/label[contains(@id, 'syi-bidding-switch')]")
@@ -212,31 +261,22 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
     except NoSuchElementException:
         pass
 
-    # --- Select free plan ---
+
+def _step_free_plan(driver, car, ctx):
     print(f"      Step: free plan")
-    FREE_XPATHS = [
-        "//label[@for='feature-FREE']",
-        "//label[.//span[normalize-space(text())='Gratis']]",
-        "//span[normalize-space(text())='Gratis']",
-        "//*[@id='feature-bundles']//*[normalize-space(text())='Gratis']",
-    ]
-    free_clicked = False
-    for xp in FREE_XPATHS:
-        try:
-            el = driver.find_element(By.XPATH, xp)
-            driver.execute_script("arguments[0].click();", el)
-            time.sleep(_w(1))
-            free_clicked = True
-            break
-        except NoSuchElementException:
-            continue
-    if not free_clicked:
+    try:
+        el = locators.find(driver, 'free_plan')
+    except NoSuchElementException:
         raise RuntimeError("Could not select free plan — skipping to avoid paid submission")
+    driver.execute_script("arguments[0].click();", el)
+    time.sleep(_w(1))
+
 
-    # --- Submit ---
+def _step_submit(driver, car, ctx):
+    """Submit the form. Never retried or restarted: the submission may have gone through."""
     print(f"      Step: submit")
     form_url = driver.current_url
-    elem_submit = driver.find_element(By.XPATH, "//button[contains(@data-testid, 'place-listing-submit-button')]")
+    elem_submit = locators.find(driver, 'submit_button')
     elem_submit.click()
     time.sleep(_w(20))
     post_url = driver.current_url
@@ -246,66 +286,80 @@ def post_listing(driver, car: CarData, max_photos=None, desc_footer=""):
             f"Post submission failed — URL did not navigate away from form ({post_url}). "
             f"Skipping delete to preserve original listing."
         )
-    print(f"    Posted new listing: '{car.var_title}'")
+
+
+# (name, function, in-place retries, restart the form if retries run out)
+POST_STEPS = [
+    ("plaats zoekertje", _step_open_form,   1, True),
+    ("title",            _step_title,       2, True),
+    ("category/brand",   _step_category,    1, True),
+    ("photos",           _step_photos,      0, True),
+    ("description",      _step_description, 2, True),
+    ("url",              _step_url,         1, True),
+    ("model",            _step_model,       2, True),
+    ("selects",          _step_selects,     2, True),
+    ("numerics",         _step_numerics,    2, True),
+    ("options",          _step_options,     2, True),
+    ("price",            _step_price,       2, True),
+    ("bidding",          _step_bidding,     0, True),
+    ("free plan",        _step_free_plan,   3, True),
+    ("submit",           _step_submit,      0, False),
+]
+
+
+def photo_files(picspath, max_photos=None):
+    """Return the photo paths to upload from a car's photo folder, in name order."""
+    all_files = []
+    for dirname, _, filenames in os.walk(picspath):
+        for filename in sorted(filenames):
+            if max_photos is not None and len(all_files) >= max_photos:
+                break
+            all_files.append(os.path.join(dirname, filename))
+    return all_files
+
+
+def _archive_photos(car):
+    """Move the photo folder to photos/old/ once the listing is posted."""
+    if not (car.var_picspath and os.path.isdir(car.var_picspath)):
+        return
+    old_dir = os.path.join(os.path.dirname(car.var_picspath), "old")
+    os.makedirs(old_dir, exist_ok=True)
+    dest = os.path.join(old_dir, os.path.basename(car.var_picspath))
+    if os.path.exists(dest):
+        shutil.rmtree(dest)
+    shutil.move(car.var_picspath, dest)
+    print(f"      Moved photos to: {dest}")
 
 
 def delete_old_listing(driver, car: CarData):
     """
     Delete the OLD (original) listing on the dashboard.
     After post_listing() there are two listings with the same title;
-    we delete the second one (index [1]) which is the older entry.
+    the original is the one with the listing ID from car.edit_url.
     """
     driver.get(DASHBOARD_URL)
     time.sleep(_w(3))
 
+    listing_id = car.edit_url.rstrip('/').split('/')[-1]
+
     try:
-        # Safety check: both old and new listing must be visible (2 matches) before deleting.
-        # The new listing may take a moment to appear, so wait up to 30s.
+        # Safety check: a new listing with exactly this title and another listing ID
+        # must be visible before deleting the original. It may take a moment to
+        # appear, so wait up to 30s.
+        def new_copies(d):
+            return [i for i in scraper.listing_ids_for_title(d, car.var_title) if i != listing_id]
+
         try:
-            WebDriverWait(driver, 30).until(
-                lambda d: len(d.find_elements(By.XPATH, f"//span[contains(text(),'{car.var_title}')]")) >= 2
-            )
+            copies = WebDriverWait(driver, 30, poll_frequency=3).until(new_copies)
         except TimeoutException:
-            pass
-        matches = driver.find_elements(By.XPATH, f"//span[contains(text(),'{car.var_title}')]")
-        if len(matches) < 2:
-            raise Exception(
-                f"Cannot delete old listing: only {len(matches)} listing(s) found for "
-                f"'{car.var_title}'. New listing may not be posted — skipping delete."
-            )
-
-        # Find the old listing by its known listing ID from the edit URL.
-        listing_id = car.edit_url.rstrip('/').split('/')[-1]
-        old_listings = driver.find_elements(By.XPATH, f"//a[contains(@href, '{listing_id}')]")
-        if not old_listings:
+            copies = []
+        if not copies:
             raise Exception(
-                f"Cannot delete old listing: listing ID '{listing_id}' not found on dashboard. "
-                f"It may have already been deleted."
+                f"Cannot delete old listing: no other listing titled '{car.var_title}' found "
+                f"besides {listing_id}. New listing may not be posted — skipping delete."
             )
 
-        old_listing = old_listings[0]
-        driver.execute_script("arguments[0].click();", old_listing)
-        time.sleep(_w(2))
-
-        verwijder = driver.find_element(By.XPATH, "//span[text()='Verwijder']")
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", verwijder)
-        time.sleep(0.3)
-        driver.execute_script("arguments[0].click();", verwijder)
-        time.sleep(_w(2))
-
-        verkocht_btn = driver.find_element(By.XPATH, "//button[contains(text(), 'Verkocht via 2dehands')]")
-        driver.execute_script("arguments[0].click();", verkocht_btn)
-        time.sleep(_w(1))
-
-        # Optional "Direct" confirmation
-        try:
-            direct_btn = driver.find_element(By.XPATH, "//button[text() = 'Direct']")
-            driver.execute_script("arguments[0].click();", direct_btn)
-            time.sleep(_w(1))
-        except NoSuchElementException:
-            pass
-
-        time.sleep(_w(2))
+        delete_listing(driver, listing_id, verify=False)
         print(f"    Deleted old listing: '{car.var_title}'")
 
     except IndexError:
@@ -314,6 +368,54 @@ def delete_old_listing(driver, car: CarData):
         print(f"    Warning: delete flow element not found for '{car.var_title}': {e}")
 
 
+def delete_listing(driver, listing_id, verify=True):
+    """
+    Delete the listing with this ID through the dashboard ("Verwijder" →
+    "Verkocht via 2dehands"). Raises if the listing or a button of the delete
+    flow cannot be found, or (with verify) if the listing is still on the
+    dashboard afterwards.
+    """
+    if driver.current_url != DASHBOARD_URL:
+        driver.get(DASHBOARD_URL)
+        time.sleep(_w(3))
+
+    listings = driver.find_elements(By.XPATH, f"//a[contains(@href, '{listing_id}')]")
+    if not listings:
+        raise Exception(
+            f"Cannot delete listing: listing ID '{listing_id}' not found on dashboard. "
+            f"It may have already been deleted."
+        )
+
+    driver.execute_script("arguments[0].click();", listings[0])
+    time.sleep(_w(2))
+
+    verwijder = driver.find_element(By.XPATH, "//span[text()='Verwijder']")
+    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", verwijder)
+    time.sleep(0.3)
+    driver.execute_script("arguments[0].click();", verwijder)
+    time.sleep(_w(2))
+
+    verkocht_btn = driver.find_element(By.XPATH, "//button[contains(text(), 'Verkocht via 2dehands')]")
+    driver.execute_script("arguments[0].click();", verkocht_btn)
+    time.sleep(_w(1))
+
+    # Optional "Direct" confirmation
+    try:
+        direct_btn = driver.find_element(By.XPATH, "//button[text() = 'Direct']")
+        driver.execute_script("arguments[0].click();", direct_btn)
+        time.sleep(_w(1))
+    except NoSuchElementException:
+        pass
+
+    time.sleep(_w(2))
+
+    if verify:
+        driver.get(DASHBOARD_URL)
+        time.sleep(_w(3))
+        if driver.find_elements(By.XPATH, f"//a[contains(@href, '{listing_id}')]"):
+            raise Exception(f"Listing '{listing_id}' is still on the dashboard after deleting it.")
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -338,9 +440,22 @@ def _set_numeric(driver, id_fragment, value):
         return
     try:
         el = driver.find_element(By.XPATH, f"//input[contains(@id, '{id_fragment}')]")
-        el.click()
-        el.send_keys(value)
-        el.send_keys(Keys.TAB)
+        _type_value(el, value)
         time.sleep(_w(0.5))
     except NoSuchElementException:
         pass
+
+
+def _type_value(el, value, click=True):
+    """Type value into an input and TAB out. Skips fields that already hold it and
+    replaces (rather than appends to) any other content, so steps can be retried."""
+    current = el.get_attribute("value") or ""
+    if current == value:
+        return
+    if click:
+        el.click()
+    if current:
+        el.send_keys(Keys.CONTROL, 'a')
+        el.send_keys(Keys.DELETE)
+    el.send_keys(value)
+    el.send_keys(Keys.TAB)
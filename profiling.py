@@ -0,0 +1,83 @@
+"""
+profiling.py — Opt-in accounting of WebDriver commands: how many round-trips
+               to chromedriver each call site issues and how long they take.
+
+instrument() patches driver.execute on the instance. Every command goes
+through it, including the ones issued by WebElement methods (find_element on
+an element, get_attribute, is_selected, send_keys, ...), which a proxy
+object around the driver would not see since elements keep a reference to
+the real driver. Each command is attributed to the nearest calling function
+in this project and to the current history step.
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+
+import history
+
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+# (call site, step) -> {'count', 'seconds', 'commands': {command: count}}
+_stats = defaultdict(lambda: {'count': 0, 'seconds': 0.0, 'commands': defaultdict(int)})
+
+
+def instrument(driver):
+    """Count and time every WebDriver command the driver sends. Returns the driver."""
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = _stats[(_call_site(), history.current_step() or "-")]
+            entry['count'] += 1
+            entry['seconds'] += elapsed
+            entry['commands'][driver_command] += 1
+
+    driver.execute = execute
+    return driver
+
+
+def _call_site():
+    """Return 'module.function:line' of the innermost caller inside this project."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if os.path.dirname(filename) == _PROJECT_DIR and filename != _THIS_FILE:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "(unknown)"
+
+
+def reset():
+    _stats.clear()
+
+
+def report(top=15):
+    """Return printable lines: top call sites by command count and by total latency."""
+    if not _stats:
+        return []
+    total_count = sum(e['count'] for e in _stats.values())
+    total_secs = sum(e['seconds'] for e in _stats.values())
+    lines = [f"WebDriver commands: {total_count} in {total_secs:.1f}s"]
+
+    def rows(key):
+        ranked = sorted(_stats.items(), key=lambda kv: kv[1][key], reverse=True)[:top]
+        for (site, step), e in ranked:
+            commands = ", ".join(f"{c} x{n}" for c, n in
+                                 sorted(e['commands'].items(), key=lambda kv: -kv[1])[:3])
+            lines.append(f"  {e['count']:>6}  {e['seconds']:8.2f}s  {e['seconds'] / e['count'] * 1000:7.1f}ms avg  "
+                         f"{site}  [{step}]  {commands}")
+
+    lines.append(f"Top {top} call sites by count:")
+    rows('count')
+    lines.append(f"Top {top} call sites by total latency:")
+    rows('seconds')
+    return lines
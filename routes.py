@@ -0,0 +1,96 @@
+"""
+routes.py — On-disk cache of edit-form URLs, so the scraper can open a
+            listing's edit form directly instead of clicking through the
+            dashboard and the "Wijzig" button.
+
+Two kinds of routes are learned from each successful click-through:
+  * the exact edit URL for that listing ID, and
+  * a URL template with the listing ID replaced by {listing_id}, which also
+    works for listings never seen before (every repost gets a new ID).
+The template is dropped after TEMPLATE_MAX_FAILURES consecutive misses.
+"""
+
+import json
+import os
+import tempfile
+
+
+ROUTES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routes.json")
+
+MAX_LISTINGS = 500
+TEMPLATE_MAX_FAILURES = 3
+
+_routes = None
+
+
+def _load():
+    global _routes
+    if _routes is None:
+        try:
+            with open(ROUTES_FILE, encoding="utf-8") as f:
+                _routes = json.load(f)
+        except (OSError, ValueError):
+            _routes = {}
+        _routes.setdefault('template', None)
+        _routes.setdefault('template_failures', 0)
+        _routes.setdefault('listings', {})
+    return _routes
+
+
+def _save():
+    # A temp file per call: several worker processes may save at the same time
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(prefix="routes.", suffix=".tmp", dir=os.path.dirname(ROUTES_FILE))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(_routes, f, indent=2)
+        os.replace(tmp, ROUTES_FILE)
+    except OSError as e:
+        # e.g. PermissionError on Windows while another worker replaces the file
+        print(f"    Warning: could not save edit routes ({e})")
+        if tmp:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def candidates(listing_id):
+    """Return the cached edit URLs to try for a listing, most specific first."""
+    routes = _load()
+    urls = []
+    if listing_id in routes['listings']:
+        urls.append(routes['listings'][listing_id])
+    if routes['template']:
+        url = routes['template'].replace("{listing_id}", listing_id)
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def learn(listing_id, edit_url):
+    """Remember a working edit URL for a listing and derive the URL template from it."""
+    routes = _load()
+    edit_url = edit_url.split("#")[0]
+    routes['listings'].pop(listing_id, None)
+    routes['listings'][listing_id] = edit_url
+    while len(routes['listings']) > MAX_LISTINGS:
+        routes['listings'].pop(next(iter(routes['listings'])))
+    if listing_id in edit_url:
+        routes['template'] = edit_url.replace(listing_id, "{listing_id}")
+        routes['template_failures'] = 0
+    _save()
+
+
+def forget(listing_id, edit_url):
+    """Record that a cached edit URL no longer opens the form."""
+    routes = _load()
+    if routes['listings'].get(listing_id) == edit_url:
+        del routes['listings'][listing_id]
+    elif routes['template'] and routes['template'].replace("{listing_id}", listing_id) == edit_url:
+        routes['template_failures'] += 1
+        if routes['template_failures'] >= TEMPLATE_MAX_FAILURES:
+            print(f"    Edit URL template failed {TEMPLATE_MAX_FAILURES}x in a row, dropping it.")
+            routes['template'] = None
+            routes['template_failures'] = 0
+    _save()
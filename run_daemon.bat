@@ -0,0 +1,11 @@
+@echo off
+@REM Keeps Chrome warm and accepts jobs, e.g.:
+@REM   venv\Scripts\python.exe daemon.py submit repost m2372621653 --wait
+pushd c:\Github\jbcars_auto
+
+
+c:\Github\jbcars_auto\venv\Scripts\python.exe daemon.py serve
+
+popd
+
+TASKKILL /IM chrome.exe /F
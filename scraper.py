@@ -7,9 +7,11 @@ import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 
 from models import CarData
+import locators
+import routes
 
 
 PHOTOS_BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "photos")
@@ -36,8 +38,22 @@ def collect_listings(driver, filter_titles=None, exclude_titles=None):
     listing_items = _collect_listing_items(driver)
     print(f"Found {len(listing_items)} listing(s) on dashboard.")
 
-    def _norm(t):
-        return re.sub(r'\s+', ' ', re.sub(r'[^a-z0-9]', ' ', t.lower())).strip()
+    filtered, stats = filter_listings(listing_items, filter_titles, exclude_titles)
+    print(f"\n{len(filtered)} car(s) to process.")
+    return filtered, stats
+
+
+def _norm(t):
+    return re.sub(r'\s+', ' ', re.sub(r'[^a-z0-9]', ' ', t.lower())).strip()
+
+
+def filter_listings(listing_items, filter_titles=None, exclude_titles=None):
+    """
+    Apply the reserved / filter / exclude rules to (title, edit_url, is_reserved)
+    tuples from the dashboard. Returns (items, stats) like collect_listings.
+    """
+    filter_norms = [_norm(f) for f in filter_titles or []]
+    exclude_norms = [_norm(e) for e in exclude_titles or []]
 
     stats = {'total': len(listing_items), 'reserved': 0, 'skipped': 0}
     filtered = []
@@ -48,24 +64,69 @@ def collect_listings(driver, filter_titles=None, exclude_titles=None):
             stats['reserved'] += 1
             continue
 
-        if filter_titles:
-            if not any(_norm(f) in _norm(title) for f in filter_titles):
+        norm_title = _norm(title)
+        if filter_norms:
+            if not any(f in norm_title for f in filter_norms):
                 print(f"  SKIP (not in filter): {title}")
                 stats['skipped'] += 1
                 continue
 
-        if exclude_titles:
-            if any(_norm(e) in _norm(title) for e in exclude_titles):
+        if exclude_norms:
+            if any(e in norm_title for e in exclude_norms):
                 print(f"  SKIP (excluded): {title}")
                 stats['skipped'] += 1
                 continue
 
         filtered.append((title, edit_url))
 
-    print(f"\n{len(filtered)} car(s) to process.")
     return filtered, stats
 
 
+def dashboard_listing_ids(driver):
+    """Open the seller dashboard and return the set of listing IDs on it (reserved ones included)."""
+    driver.get(DASHBOARD_URL)
+    time.sleep(4)
+    return {url.rstrip('/').split('/')[-1] for _, url, _ in _collect_listing_items(driver)}
+
+
+def listing_ids_for_title(driver, title):
+    """
+    Return the IDs of the listings on the loaded dashboard whose title is
+    exactly title (whitespace-normalised), so 'VW Golf' does not match
+    'VW Golf 7 GTI'. A single XPath lookup plus one href read per match, so it
+    stays cheap on large dashboards.
+    """
+    wanted = _xpath_literal(" ".join(title.split()))
+    links = driver.find_elements(
+        By.XPATH, f"//a[contains(@href, '/v/auto-s/')][.//span[normalize-space()={wanted}]]"
+    )
+    ids = []
+    for link in links:
+        href = link.get_attribute("href") or ""
+        if not href or "/seller/" in href:
+            continue
+        listing_id = _listing_id_from_href(href)
+        if listing_id not in ids:
+            ids.append(listing_id)
+    return ids
+
+
+def _xpath_literal(text):
+    """Quote text as an XPath string literal, also when it contains both quote kinds."""
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in text.split("'")) + ")"
+
+
+def _listing_id_from_href(href):
+    """Return the listing ID (e.g. m2368587070) from a /v/auto-s/[brand]/m[id]-[slug] view URL."""
+    slug = href.split("?")[0].rstrip("/").split("/")[-1]
+    m = re.match(r'^(m\d+)', slug)
+    return m.group(1) if m else slug
+
+
 def _collect_listing_items(driver):
     """
     Parse the dashboard page and return a list of tuples:
@@ -109,9 +170,7 @@ def _collect_listing_items(driver):
             title = slug.replace("-", " ").strip()
 
         # Build seller view URL from listing ID (e.g. m2368587070)
-        slug = base_url.split("/")[-1]
-        m = re.match(r'^(m\d+)', slug)
-        listing_id = m.group(1) if m else slug
+        listing_id = _listing_id_from_href(base_url)
         seller_view_url = f"https://www.2dehands.be/seller/view/{listing_id}"
 
         is_reserved = _is_reserved(driver, link)
@@ -140,45 +199,23 @@ def scrape_one_listing(driver, edit_url):
     # Extract listing ID from edit_url (e.g. "m2372621653")
     listing_id = edit_url.rstrip('/').split('/')[-1]
 
-    # Navigate to dashboard and click the listing naturally — Wijzig only appears this way
-    driver.get(DASHBOARD_URL)
-    time.sleep(_w(3))
-    try:
-        listing_link = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, f"//a[contains(@href, '{listing_id}')]"))
-        )
-        driver.execute_script("arguments[0].click();", listing_link)
-        time.sleep(_w(3))
-    except TimeoutException:
-        print(f"    Warning: could not find listing {listing_id} on dashboard")
-        return None
-
-    # Click "Wijzig" to open the edit form
-    try:
-        wijzig = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//*[contains(text(),'Wijzig')]"))
-        )
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", wijzig)
-        time.sleep(0.3)
-        driver.execute_script("arguments[0].click();", wijzig)
-        time.sleep(_w(4))
-    except TimeoutException:
-        print(f"    Warning: Wijzig button not found at {driver.current_url}")
+    if not _open_edit_form(driver, listing_id):
         return None
 
     car = CarData()
     car.edit_url = edit_url
 
     # --- Title ---
-    car.var_title = _get_input_value(driver, By.ID, "title_nl-BE")
+    car.var_title = _get_locator_value(driver, 'title_input')
 
     # --- Description ---
-    car.var_desc = _get_text(driver, By.CSS_SELECTOR, "div.RichTextEditor-module-editorInput[contenteditable='true']")
+    car.var_desc = _get_locator_text(driver, 'description_editor')
 
     # --- Price ---
-    car.var_price = _get_input_value(driver, By.XPATH, "//input[contains(@name, 'price.value')]")
+    car.var_price = _get_locator_value(driver, 'price_input')
 
     # --- Single-select attributes ---
+    # Model select when the category has one; the brand select when it is absent or empty
     car.var_model       = _get_select_value(driver, "singleSelectAttribute[model]") or \
                           _get_select_value(driver, "singleSelectAttribute[brand]")
     car.var_gas         = _get_select_value(driver, "singleSelectAttribute[fuel]")
@@ -239,21 +276,85 @@ def scrape_one_listing(driver, edit_url):
 
 
 # ---------------------------------------------------------------------------
-# Helpers — field extraction
+# Helpers — navigation
 # ---------------------------------------------------------------------------
 
-def _get_input_value(driver, by, locator):
+def _open_edit_form(driver, listing_id):
+    """
+    Open the edit form of a listing. Cached routes (see routes.py) are tried
+    first; each is validated with _edit_form_ready. Falls back to the
+    dashboard click-through and learns the resulting URL.
+    Returns True when the edit form is open.
+    """
+    for url in routes.candidates(listing_id):
+        driver.get(url)
+        if _edit_form_ready(driver, listing_id, timeout=10):
+            time.sleep(_w(1.5))  # let the form populate its values
+            routes.learn(listing_id, driver.current_url)
+            return True
+        print(f"    Warning: cached edit route did not open the form: {url}")
+        routes.forget(listing_id, url)
+
+    if not _click_through_to_edit_form(driver, listing_id):
+        return False
+    if _edit_form_ready(driver, listing_id, timeout=5):
+        routes.learn(listing_id, driver.current_url)
+    return True
+
+
+def _edit_form_ready(driver, listing_id, timeout):
+    """
+    Return True once the edit form of this listing is open: the URL still holds
+    the listing ID (the new-ad form at /plaats has a title input too) and the
+    title input has been filled with the listing's title.
+    """
     try:
-        el = driver.find_element(by, locator)
-        return el.get_attribute("value") or ""
-    except NoSuchElementException:
-        return ""
+        locators.wait_for(driver, 'title_input', timeout)
+        WebDriverWait(driver, timeout, ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)).until(
+            lambda d: (locators.find(d, 'title_input').get_attribute("value") or "").strip()
+        )
+    except TimeoutException:
+        return False
+    return listing_id in driver.current_url
+
+
+def _click_through_to_edit_form(driver, listing_id):
+    # Navigate to dashboard and click the listing naturally — Wijzig only appears this way
+    driver.get(DASHBOARD_URL)
+    time.sleep(_w(3))
+    try:
+        listing_link = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, f"//a[contains(@href, '{listing_id}')]"))
+        )
+        driver.execute_script("arguments[0].click();", listing_link)
+        time.sleep(_w(3))
+    except TimeoutException:
+        print(f"    Warning: could not find listing {listing_id} on dashboard")
+        return False
 
+    # Click "Wijzig" to open the edit form
+    try:
+        wijzig = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//*[contains(text(),'Wijzig')]"))
+        )
+        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", wijzig)
+        time.sleep(0.3)
+        driver.execute_script("arguments[0].click();", wijzig)
+        time.sleep(_w(4))
+    except TimeoutException:
+        print(f"    Warning: Wijzig button not found at {driver.current_url}")
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Helpers — field extraction
+# ---------------------------------------------------------------------------
 
-def _get_text(driver, by, locator):
+def _get_input_value(driver, by, locator):
     try:
         el = driver.find_element(by, locator)
-        return el.text or ""
+        return el.get_attribute("value") or ""
     except NoSuchElementException:
         return ""
 
@@ -267,6 +368,17 @@ def _get_select_value(driver, name):
         return ""
 
 
+def _get_locator_value(driver, name):
+    """Like _get_input_value, for an element from the locator registry."""
+    elements = locators.find_all(driver, name)
+    return (elements[0].get_attribute("value") or "") if elements else ""
+
+
+def _get_locator_text(driver, name):
+    elements = locators.find_all(driver, name)
+    return (elements[0].text or "") if elements else ""
+
+
 def _get_select_text(driver, element_id):
     """Get the visible text of the selected option in a <select> by its id."""
     try:
@@ -0,0 +1,198 @@
+"""
+uploads.py — Sends listing photos to the place-ad form and waits until the
+             browser has actually finished uploading them.
+
+Completion is detected from the upload requests in the DevTools performance
+log (see network.py). The thumbnails rendered by the uploader only confirm a
+photo when no upload request shows up at all, since the uploader renders a
+local preview before the file has been sent; an error marker on a thumbnail
+always counts as a failure.
+Files that fail are re-sent individually; post_listing aborts if any photo
+is still missing after MAX_UPLOAD_RETRIES.
+"""
+
+import os
+import time
+from fnmatch import fnmatch
+
+import locators
+import network
+
+
+# Upload requests issued by the uploader script (CDP wildcard syntax).
+UPLOAD_URL_PATTERNS = ["*upload*", "*/images*"]
+UPLOAD_METHODS = ("POST", "PUT")
+
+MAX_UPLOAD_RETRIES = 2
+
+# Seconds to wait for the first upload request before trusting thumbnails alone.
+NETWORK_SIGNAL_GRACE = 5
+
+# Returns one state per thumbnail in the uploader, in display order:
+# 'ok' (image rendered), 'error' (error marker) or 'pending' (spinner / not loaded).
+_THUMBNAIL_STATES_JS = """
+var input = arguments[0];
+var root = input;
+for (var i = 0; i < 6 && root.parentElement; i++) {
+    root = root.parentElement;
+    if (root.querySelectorAll('img').length) break;
+}
+var states = [];
+root.querySelectorAll('img').forEach(function (img) {
+    var box = img.closest('li, figure, [class*="Thumbnail"], [class*="thumbnail"], [class*="Image"]') || img.parentElement;
+    var cls = (box.className || '').toString().toLowerCase();
+    if (cls.indexOf('error') >= 0 || box.querySelector('[class*="rror"], [role="alert"]')) {
+        states.push('error');
+    } else if (!img.complete || !img.naturalWidth ||
+               box.querySelector('[class*="pinner"], [class*="rogress"], [class*="oading"]')) {
+        states.push('pending');
+    } else {
+        states.push('ok');
+    }
+});
+return states;
+"""
+
+
+def upload_photos(driver, files):
+    """
+    Upload files through the form's image input and wait for confirmation.
+    Failed files are retried one by one.
+
+    Returns a list of per-file dicts: {'file', 'status', 'seconds', 'attempts'}
+    where status is 'ok' or 'failed'. Raises RuntimeError if the uploader
+    input cannot be found.
+    """
+    upload_input = _find_upload_input(driver)
+
+    report = [{'file': f, 'status': 'pending', 'seconds': 0.0, 'attempts': 0} for f in files]
+
+    batch = list(range(len(files)))
+    for attempt in range(1 + MAX_UPLOAD_RETRIES):
+        if not batch:
+            break
+        if attempt:
+            print(f"      Retrying {len(batch)} failed photo(s) (attempt {attempt + 1})")
+            upload_input = _find_upload_input(driver)
+        results = _send_and_wait(driver, upload_input, [files[i] for i in batch])
+        for i, (status, seconds) in zip(batch, results):
+            report[i].update(status=status, seconds=seconds, attempts=attempt + 1)
+        batch = [i for i in batch if report[i]['status'] != 'ok']
+
+    for entry in report:
+        if entry['status'] != 'ok':
+            entry['status'] = 'failed'
+    return report
+
+
+def format_report(report):
+    """Return one printable line per file."""
+    lines = []
+    for i, entry in enumerate(report, start=1):
+        retry = f", {entry['attempts']} attempt(s)" if entry['attempts'] > 1 else ""
+        lines.append(f"photo {i} {os.path.basename(entry['file'])}: "
+                     f"{entry['status']} ({entry['seconds']:.1f}s{retry})")
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _find_upload_input(driver):
+    inputs = locators.find_all(driver, 'image_uploader')
+    if not inputs:
+        raise RuntimeError("Image uploader input not found on form.")
+    return inputs[-1]
+
+
+def _thumbnail_states(driver, upload_input):
+    try:
+        return driver.execute_script(_THUMBNAIL_STATES_JS, upload_input) or []
+    except Exception:
+        return []
+
+
+def _is_upload_request(params):
+    request = params.get("request", {})
+    url = request.get("url", "")
+    return (request.get("method") in UPLOAD_METHODS
+            and any(fnmatch(url, p) for p in UPLOAD_URL_PATTERNS))
+
+
+def _send_and_wait(driver, upload_input, files):
+    """
+    Send one batch of files and wait for each to be confirmed or to fail.
+    Returns [(status, seconds)] in file order, status 'ok' / 'failed'.
+
+    Upload requests and thumbnails are matched to files in selection order,
+    which is the order the uploader queues them in.
+    """
+    count = len(files)
+    network.read_perf_log(driver)  # skip events from before this batch
+    thumbs_before = len(_thumbnail_states(driver, upload_input))
+
+    start = time.monotonic()
+    upload_input.send_keys('\n'.join(files))
+
+    # Hard cap, and the point where we give up if no signal was seen at all
+    # (e.g. uploader markup changed and the performance log is unavailable).
+    timeout = max(60, count * 6)
+    blind_wait = max(15, count * 1.5)
+
+    requests = {}     # requestId -> index in upload order
+    net_state = []    # 'pending' / 'ok' / 'failed', in upload order
+    finished_at = {}  # index -> seconds since start
+
+    while True:
+        now = time.monotonic() - start
+
+        for method, params in network.iter_events(network.read_perf_log(driver)):
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent" and _is_upload_request(params):
+                if request_id not in requests and len(net_state) < count:
+                    requests[request_id] = len(net_state)
+                    net_state.append('pending')
+            elif method == "Network.responseReceived" and request_id in requests:
+                if params.get("response", {}).get("status", 0) >= 400:
+                    net_state[requests[request_id]] = 'failed'
+            elif method == "Network.loadingFinished" and request_id in requests:
+                idx = requests[request_id]
+                if net_state[idx] == 'pending':
+                    net_state[idx] = 'ok'
+                finished_at[idx] = now
+            elif method == "Network.loadingFailed" and request_id in requests:
+                idx = requests[request_id]
+                net_state[idx] = 'failed'
+                finished_at[idx] = now
+
+        thumbs = _thumbnail_states(driver, upload_input)[thumbs_before:thumbs_before + count]
+
+        states = []
+        for i in range(count):
+            thumb = thumbs[i] if i < len(thumbs) else 'pending'
+            net = net_state[i] if i < len(net_state) else 'pending'
+            if thumb == 'error' or net == 'failed':
+                states.append('failed')
+            elif net == 'ok':
+                states.append('ok')
+            elif thumb == 'ok' and not net_state and now >= NETWORK_SIGNAL_GRACE:
+                # No upload request seen at all (performance log unavailable or URL
+                # patterns out of date) — the rendered thumbnail is all we have
+                states.append('ok')
+            else:
+                states.append('pending')
+            if states[-1] != 'pending' and i not in finished_at:
+                finished_at[i] = now
+
+        if 'pending' not in states:
+            break
+        if now >= timeout:
+            print(f"      Warning: photo upload timed out after {now:.0f}s")
+            break
+        if now >= blind_wait and not thumbs and not net_state:
+            print(f"      Warning: no upload progress signal seen, assuming photos uploaded")
+            return [('ok', now)] * count
+        time.sleep(0.5)
+
+    return [(s if s == 'ok' else 'failed', finished_at.get(i, now)) for i, s in enumerate(states)]
@@ -0,0 +1,163 @@
+"""
+workqueue.py — Shared local work queue so several main.py workers can split
+               the listings of one run without processing any listing twice.
+
+Backed by a SQLite database on a filesystem all workers can reach. It uses
+the rollback journal rather than WAL, which SQLite does not support on
+network filesystems; a network share still needs working file locking
+(SMB does, some NFS setups do not). Every
+worker collects the dashboard and enqueues what it finds; items are keyed by
+(queue, title) so the fresh copy of an already reposted car is never
+enqueued again. A worker claims one item at a time under a lease, which a
+background heartbeat thread keeps extending while the worker is alive. When a
+worker dies its lease runs out and another worker reclaims the item.
+
+Items move pending → leased → done / failed. 'posted' is set as soon as the
+new listing is submitted, so a reclaimed item only finishes the delete.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+
+WORK_QUEUE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workqueue.db")
+
+# A lease must outlive the slowest single car (scrape + photos + post + delete).
+LEASE_SECONDS = 600
+HEARTBEAT_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    queue         TEXT NOT NULL,
+    title         TEXT NOT NULL,
+    edit_url      TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    posted        INTEGER NOT NULL DEFAULT 0,
+    worker        TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    error         TEXT,
+    updated_at    REAL,
+    PRIMARY KEY (queue, title)
+);
+CREATE INDEX IF NOT EXISTS idx_items_next ON items(queue, status, attempts, updated_at);
+"""
+
+
+def worker_name(worker_id):
+    """Return a name that is unique per worker process across machines."""
+    return f"{socket.gethostname()}:{os.getpid()}:w{worker_id}"
+
+
+def connect(db_path=WORK_QUEUE_DB):
+    # isolation_level=None: transactions are managed explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    # Not WAL: its shared-memory index does not work across machines on a network share
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue(conn, queue, items):
+    """Add (title, edit_url) items to the queue. Titles already queued are ignored. Returns the number added."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO items (queue, title, edit_url, updated_at) VALUES (?, ?, ?, ?)",
+            [(queue, title, edit_url, now) for title, edit_url in items],
+        )
+        added = conn.total_changes - before
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return added
+
+
+def claim(conn, queue, worker):
+    """
+    Lease the next available item: pending, or leased by a worker whose lease expired.
+    Returns a dict with 'title', 'edit_url', 'attempts', 'posted', or None when nothing is left.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Two queries so each is served by idx_items_next without a sort. Pending
+        # items have never been attempted, so they come before expired leases.
+        row = conn.execute(
+            "SELECT title, edit_url, attempts, posted, worker FROM items "
+            "WHERE queue = ? AND status = 'pending' ORDER BY attempts, updated_at LIMIT 1",
+            (queue,),
+        ).fetchone() or conn.execute(
+            "SELECT title, edit_url, attempts, posted, worker FROM items "
+            "WHERE queue = ? AND status = 'leased' AND lease_expires < ? ORDER BY attempts, updated_at LIMIT 1",
+            (queue, now),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        title, edit_url, attempts, posted, previous = row
+        conn.execute(
+            "UPDATE items SET status = 'leased', worker = ?, lease_expires = ?, "
+            "attempts = attempts + 1, updated_at = ? WHERE queue = ? AND title = ?",
+            (worker, now + LEASE_SECONDS, now, queue, title),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if previous:
+        print(f"  Reclaimed expired lease from {previous}: {title}")
+    return {'title': title, 'edit_url': edit_url, 'attempts': attempts + 1, 'posted': bool(posted)}
+
+
+def mark_posted(conn, queue, title, worker):
+    """Record that the new listing was submitted, so a reclaim never posts it again."""
+    conn.execute(
+        "UPDATE items SET posted = 1, updated_at = ? WHERE queue = ? AND title = ? AND worker = ?",
+        (time.time(), queue, title, worker),
+    )
+
+
+def complete(conn, queue, title, worker, status, error=None):
+    """Finish a leased item with status 'done' or 'failed'."""
+    conn.execute(
+        "UPDATE items SET status = ?, error = ?, lease_expires = NULL, updated_at = ? "
+        "WHERE queue = ? AND title = ? AND worker = ?",
+        (status, error, time.time(), queue, title, worker),
+    )
+
+
+def counts(conn, queue):
+    """Return {status: count} for the queue."""
+    return dict(conn.execute(
+        "SELECT status, COUNT(*) FROM items WHERE queue = ? GROUP BY status", (queue,)
+    ).fetchall())
+
+
+def start_heartbeat(queue, worker, db_path=WORK_QUEUE_DB, interval=HEARTBEAT_SECONDS):
+    """
+    Extend this worker's leases every `interval` seconds from a background thread.
+    Returns a threading.Event; set it to stop the heartbeat.
+    """
+    stop = threading.Event()
+
+    def beat():
+        conn = connect(db_path)
+        while not stop.wait(interval):
+            try:
+                conn.execute(
+                    "UPDATE items SET lease_expires = ? WHERE queue = ? AND worker = ? AND status = 'leased'",
+                    (time.time() + LEASE_SECONDS, queue, worker),
+                )
+            except sqlite3.Error as e:
+                print(f"  Warning: lease heartbeat failed: {e}")
+        conn.close()
+
+    threading.Thread(target=beat, name="lease-heartbeat", daemon=True).start()
+    return stop